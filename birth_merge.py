@@ -1,24 +1,224 @@
+import itertools
 import json
 import logging
-from collections import defaultdict
+from collections import defaultdict, Counter
 import uuid
-from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
 
 import networkx as nx
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 import comparison
 import graph_model
-from mcgregor import mcgregor
+from mcgregor import mcgregor, compatibility_matrix, matching_bound, FlatGraph
 
+# number of worker processes used to run McGregor searches against several targets at once (None to run the searches
+# serially)
+WORKERS = None
 
-def node_match(g1, g2, node1, node2):
-    return not comparison.person_mismatch(g1.nodes[node1]["person"], g2.nodes[node2]["person"])
 
+def cached_matchers(graph):
+    """Construct node and edge comparison functions for mcgregor() that memoize their results.
 
-def edge_match(g1, g2, n1_in_g1, n2_in_g1, n1_in_g2, n2_in_g2):
-    type1 = g1.edges[n1_in_g1, n2_in_g1]["relation"].relationship_type
-    type2 = g2.edges[n1_in_g2, n2_in_g2]["relation"].relationship_type
-    return type1 == type2
+    The McGregor search revisits the same node and edge pairs many times while backtracking, so the underlying
+    comparisons are cached on node identifiers rather than on the (transient) subgraph views. Since the graph is
+    modified when twigs are merged, a fresh pair of functions should be constructed for each new twig.
+
+    Args:
+        graph (nx.DiGraph): The graph containing all nodes and edges that will be compared.
+
+    Returns:
+        A tuple containing the node comparison function and the edge comparison function.
+    """
+    @lru_cache(maxsize=None)
+    def person_match(id1, id2):
+        return not comparison.person_mismatch(graph.nodes[id1]["person"], graph.nodes[id2]["person"])
+
+    @lru_cache(maxsize=None)
+    def relation_match(edge1, edge2):
+        return graph.edges[edge1]["relation"].relationship_type == graph.edges[edge2]["relation"].relationship_type
+
+    def node_match(g1, g2, node1, node2):
+        return person_match(*sorted((node1, node2)))
+
+    def edge_match(g1, g2, n1_in_g1, n2_in_g1, n1_in_g2, n2_in_g2):
+        return relation_match(*sorted(((n1_in_g1, n2_in_g1), (n1_in_g2, n2_in_g2))))
+
+    return node_match, edge_match
+
+
+def person_key(graph, node):
+    return comparison.mismatch_key(graph.nodes[node]["person"])
+
+
+def key_counts(twig_graph):
+    """Count the persons in a twig by their person_key(), ignoring those that cannot match anyone."""
+    return Counter(key for key in (person_key(twig_graph, node) for node in twig_graph.nodes) if key is not None)
+
+
+def relation_type_match(g1, g2, n1_in_g1, n2_in_g1, n1_in_g2, n2_in_g2):
+    return g1.edges[n1_in_g1, n2_in_g1]["type"] == g2.edges[n1_in_g2, n2_in_g2]["type"]
+
+
+def flatten_twig(twig):
+    """Reduce a flattened twig to plain data so that it can be cheaply sent to a worker process.
+
+    Args:
+        twig (FlatGraph): The twig.
+
+    Returns:
+        A tuple containing the number of nodes and a list of (from, to, relationship type) edge tuples.
+    """
+    index = twig.index
+    edges = [(index[u], index[v], relation.relationship_type) for u, v, relation in twig.graph.edges.data("relation")]
+    return len(index), edges
+
+
+def run_mcs(task):
+    """Run mcgregor() on a pair of flattened twigs, as produced by flatten_twig().
+
+    This is a module-level function so that it can be used with a ProcessPoolExecutor.
+
+    Args:
+        task (tuple): The flattened first twig, the flattened second twig, their node compatibility matrix, and the
+            minimum match size.
+
+    Returns:
+        The maximal common subgraphs, in terms of the integer node labels.
+    """
+    graphs = []
+    for n_nodes, edges in task[:2]:
+        graph = nx.DiGraph()
+        graph.add_nodes_from(range(n_nodes))
+        graph.add_edges_from((u, v, {"type": relationship_type}) for u, v, relationship_type in edges)
+        graphs.append(graph)
+    return mcgregor(graphs[0], graphs[1], edge_comparison=relation_type_match, compat=task[2], min_size=task[3],
+                    stop_on_multiple=True).maximal_common_subgraphs
+
+
+def match_targets(new_twig, ranked_targets, processed_twigs, graph, matchers, minimum_match_size,
+                  twig_cache=None, executor=None, batch_size=1):
+    """Find the maximal common subgraphs of a new twig with each of a sequence of target twigs.
+
+    Targets that are too small, or that have too few persons compatible with those in the new twig, are skipped
+    without running the McGregor search. If an executor is given, the searches are run concurrently in batches of
+    batch_size targets, but the results are still yielded in the order of ranked_targets. Closing the generator
+    cancels any searches that have not yet started.
+
+    Args:
+        new_twig (set): The identifiers of the persons in the new twig.
+        ranked_targets (list): The keys of the target twigs in processed_twigs, in the order to be attempted.
+        processed_twigs (dict): The processed twigs and their surnames, keyed by twig identifier.
+        graph (nx.DiGraph): The graph containing all persons.
+        matchers (tuple): The node and edge comparison functions, as returned by cached_matchers().
+        minimum_match_size (int): The smallest number of persons that a useful match can contain.
+        twig_cache (dict): Tuples of the FlatGraph snapshot (of a subgraph view) and the key counts (as returned by
+            key_counts()) of the processed twigs, keyed by twig identifier. Missing entries are created and added to
+            it, so the entry for a twig must be removed whenever the twig changes.
+        executor (concurrent.futures.Executor): An optional executor used to run the searches.
+        batch_size (int): The number of searches submitted to the executor at a time.
+
+    Yields:
+        Tuples containing the target key and the list of maximal common subgraphs.
+    """
+    logger = logging.getLogger(__name__)
+    node_match, edge_match = matchers
+    new_twig_graph = FlatGraph(graph.subgraph(new_twig))
+    new_twig_keys = key_counts(new_twig_graph.graph)
+    if twig_cache is None:
+        twig_cache = {}
+
+    def mcs_error(target_key):
+        print("error during macgregor with twig {} against\n".format(target_key))
+        print(twig_dump(new_twig, graph))
+        # this currently only happens in the weird case where there are two children of the same name of the
+        # same parents.
+        # TODO ignore it for now
+
+    def prepared_targets():
+        for target_key in ranked_targets:
+            target_twig = processed_twigs[target_key][0]
+            if min(len(new_twig), len(target_twig)) < minimum_match_size:
+                logger.debug("target twig too small to achieve minimum match size")
+                continue
+            logger.debug("attempting to merge {} with {}".format(new_twig, target_twig))
+            if target_key not in twig_cache:
+                target_twig_graph = FlatGraph(graph.subgraph(target_twig))
+                twig_cache[target_key] = (target_twig_graph, key_counts(target_twig_graph.graph))
+            target_twig_graph, target_twig_keys = twig_cache[target_key]
+            # persons can only be matched to persons with the same key, which bounds the size of any match
+            if sum((new_twig_keys & target_twig_keys).values()) < minimum_match_size:
+                logger.debug("too few persons with matching gender to achieve minimum match size")
+                continue
+            if len(new_twig) < len(target_twig):
+                graph1, graph2 = new_twig_graph, target_twig_graph
+            else:
+                graph1, graph2 = target_twig_graph, new_twig_graph
+            # the node comparisons are part of the McGregor search, so their errors are handled in the same way
+            try:
+                compat = compatibility_matrix(graph1, graph2, node_match, node_key=person_key)
+                too_few_compatible = matching_bound(compat) < minimum_match_size
+            except ValueError:
+                mcs_error(target_key)
+                continue
+            if too_few_compatible:
+                logger.debug("too few compatible persons to achieve minimum match size")
+                continue
+            yield target_key, graph1, graph2, compat
+
+    if executor is None:
+        for target_key, graph1, graph2, compat in prepared_targets():
+            try:
+                mcs = mcgregor(graph1, graph2, edge_comparison=edge_match, compat=compat, min_size=minimum_match_size,
+                               stop_on_multiple=True)
+            except ValueError:
+                mcs_error(target_key)
+                continue
+            yield target_key, mcs.maximal_common_subgraphs
+        return
+
+    pending = prepared_targets()
+    while True:
+        batch = []
+        for target_key, graph1, graph2, compat in pending:
+            task = (flatten_twig(graph1), flatten_twig(graph2), compat, minimum_match_size)
+            batch.append((target_key, graph1.nodes, graph2.nodes, executor.submit(run_mcs, task)))
+            if len(batch) == batch_size:
+                break
+        if not batch:
+            return
+        try:
+            for target_key, labels1, labels2, future in batch:
+                try:
+                    subgraphs = future.result()
+                except ValueError:
+                    mcs_error(target_key)
+                    continue
+                yield target_key, [{labels1[k]: labels2[v] for k, v in subgraph.items()} for subgraph in subgraphs]
+        finally:
+            for _, _, _, future in batch:
+                future.cancel()
+
+
+def write_json(data, filename):
+    """Write JSON-serializable data to a file with an indentation of 2, using orjson if it is installed."""
+    if orjson is None:
+        with open(filename, 'w') as json_file:
+            json.dump(data, json_file, indent=2)
+    else:
+        with open(filename, 'wb', buffering=1 << 20) as json_file:
+            json_file.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+
+def append_dump(twig_id, parts):
+    """Append a list of strings to the dump file of a twig, opening the file only once."""
+    with open("twigdump_{}".format(twig_id), "a", buffering=1 << 16) as dumpfile:
+        dumpfile.writelines(parts)
 
 
 def twig_dump(twig, graph):
@@ -37,9 +237,9 @@ def twig_dump(twig, graph):
 
 def add_processed_twig(new_twig, new_twig_surnames, processed_twigs, surname_index):
     id = str(uuid.uuid4())
-    processed_twigs[id] = new_twig
+    processed_twigs[id] = (set(new_twig), new_twig_surnames)
     for name in new_twig_surnames:
-        surname_index[name] = surname_index[name] | {id}
+        surname_index[name].add(id)
     return id
 
 
@@ -53,7 +253,13 @@ def sanity_check(graph):
             raise
 
 
-def main():
+def main(workers=WORKERS):
+    """Merge the twigs of the graph in dum.json and write the result to dum2.json.
+
+    Args:
+        workers (int or None): The number of worker processes used for the McGregor searches, or None to run them
+            serially in this process.
+    """
     logging.basicConfig(format='%(asctime)s %(name)-12s %(levelname)-8s %(message)s', level=logging.WARNING)
     logging.getLogger('mcgregor').setLevel(logging.WARNING)
     logging.getLogger('comparison').setLevel(logging.WARNING)
@@ -66,196 +272,198 @@ def main():
 
     the_graph_model = graph_model.PeopleGraph(graph_json=input_json)
     the_graph = the_graph_model.graph
-    the_graph_not_merged = the_graph.subgraph([node for node in the_graph.nodes
-                                               if not the_graph.nodes[node]["person"].merged])
-    twig_queue = sorted(list(nx.weakly_connected_components(the_graph_not_merged)), key=len)
+    the_graph_not_merged = the_graph.subgraph(the_graph_model.alive)
+    # twigs are tracked with a union-find structure so that they stay up to date as Persons are merged
+    twigs = nx.utils.UnionFind(the_graph_not_merged.nodes)
+    for u, v in the_graph_not_merged.edges:
+        twigs.union(u, v)
+    # sorted in ascending order of size, so that pop() yields the largest remaining twig first
+    twig_queue = sorted(twigs.to_sets(), key=len)
     processed_twigs = {}
+    twig_cache = {}
     surname_index = defaultdict(set)
     sanity_check(the_graph_model.graph)
 
     minimum_match_size = 5
-
-    while twig_queue:
-        new_twig = list(twig_queue.pop())
-        if len(new_twig) < minimum_match_size:
-            logger.debug("twig too small to achieve minimum match size, terminating")
-            break
-
-        new_twig_graph = the_graph.subgraph(new_twig)
-        new_twig_surnames = [the_graph.nodes[person_id]["person"].standardized_surnames() for person_id in new_twig]
-        new_twig_surnames = set().union(*new_twig_surnames)
-
-        if not processed_twigs:
-            id = add_processed_twig(new_twig, new_twig_surnames, processed_twigs, surname_index)
-            if spew:
-                with open("twigdump_{}".format(id), "a") as dumpfile:
-                    dumpfile.write("initializing with")
-                    dumpfile.write(twig_dump(processed_twigs[id], the_graph))
-            continue
-
-        targets = set()
-        for name in new_twig_surnames:
-            targets = targets | surname_index[name]
-
-        if not targets:
-            id = add_processed_twig(new_twig, new_twig_surnames, processed_twigs, surname_index)
-            if spew:
-                with open("twigdump_{}".format(id), "a") as dumpfile:
-                    dumpfile.write("initializing with")
-                    dumpfile.write(twig_dump(processed_twigs[id], the_graph))
-            continue
-
-        merge_successful = False
-        for target_key in targets:
-            target_twig = deepcopy(processed_twigs[target_key])
-            logger.debug("attempting to merge {} with {}".format(new_twig, target_twig))
-            target_twig_graph = the_graph.subgraph(target_twig)
-            try:
-                if len(new_twig) < len(target_twig):
-                    flipped = False
-                    mcs = mcgregor(new_twig_graph, target_twig_graph,
-                                   node_comparison=node_match, edge_comparison=edge_match)
-                else:
-                    flipped = True
-                    mcs = mcgregor(target_twig_graph, new_twig_graph,
-                                   node_comparison=node_match, edge_comparison=edge_match)
-            except ValueError:
-                print("error during macgregor with twig {} against\n".format(target_key))
-                print(twig_dump(new_twig, the_graph))
-                # this currently only happens in the weird case where there are two children of the same name of the
-                # same parents.
-                # TODO ignore it for now
+    # target twigs must share at least this many standardized surnames with a new twig to be considered
+    minimum_shared_surnames = 1
+    with ProcessPoolExecutor(max_workers=workers) if workers else nullcontext() as executor:
+        while twig_queue:
+            new_twig = twig_queue.pop()
+            if len(new_twig) < minimum_match_size:
+                logger.debug("twig too small to achieve minimum match size, terminating")
+                break
+
+            new_twig_surnames = frozenset().union(*(the_graph.nodes[person_id]["person"].standardized_surnames()
+                                                     for person_id in new_twig))
+
+            if not processed_twigs:
+                id = add_processed_twig(new_twig, new_twig_surnames, processed_twigs, surname_index)
+                if spew:
+                    append_dump(id, ["initializing with", twig_dump(processed_twigs[id][0], the_graph)])
                 continue
 
-            if not mcs.maximal_common_subgraphs:
-                logger.info("no common subgraph")
-                continue
-            if len(mcs.maximal_common_subgraphs) > 1:
-                logger.info("multiple maximal common subgraphs, skipping")
-                continue
+            # count the surnames that each candidate target twig shares with the new twig
+            shared_surnames = Counter()
+            for name in new_twig_surnames:
+                shared_surnames.update(surname_index[name])
+            targets = [key for key, count in shared_surnames.items() if count >= minimum_shared_surnames]
 
-            match = mcs.maximal_common_subgraphs[0]
-            if len(match) < minimum_match_size:
-                logger.debug("match not big enough")
+            if not targets:
+                id = add_processed_twig(new_twig, new_twig_surnames, processed_twigs, surname_index)
+                if spew:
+                    append_dump(id, ["initializing with", twig_dump(processed_twigs[id][0], the_graph)])
                 continue
 
-            logger.warning("good match, merging into {}".format(target_key))
-            if spew:
-                with open("twigdump_{}".format(target_key), "a") as dumpfile:
-                    dumpfile.write("\n\n------------------- merging with ------------------------\n")
-                    dumpfile.write(twig_dump(new_twig, the_graph))
-                    dumpfile.write("\n\nusing the mapping\n\n")
+            node_match, edge_match = cached_matchers(the_graph)
+            # try the most promising targets first, i.e. those sharing the most surnames with the new twig
+            ranked_targets = sorted(targets, key=lambda key: (shared_surnames[key], len(processed_twigs[key][0])),
+                                    reverse=True)
+
+            merge_successful = False
+            matches = match_targets(new_twig, ranked_targets, processed_twigs, the_graph, (node_match, edge_match),
+                                    minimum_match_size, twig_cache, executor, workers)
+            for target_key, maximal_common_subgraphs in matches:
+                target_twig, target_twig_surnames = processed_twigs[target_key]
+                if not maximal_common_subgraphs:
+                    logger.info("no common subgraph")
+                    continue
+                if len(maximal_common_subgraphs) > 1:
+                    logger.info("multiple maximal common subgraphs, skipping")
+                    continue
+
+                match = maximal_common_subgraphs[0]
+                if len(match) < minimum_match_size:
+                    logger.debug("match not big enough")
+                    continue
+
+                logger.warning("good match, merging into {}".format(target_key))
+                # the dump output for this merge is collected and written to the file in one go once it is complete
+                dump_parts = []
+                if spew:
+                    dump_parts.append("\n\n------------------- merging with ------------------------\n")
+                    dump_parts.append(twig_dump(new_twig, the_graph))
+                    dump_parts.append("\n\nusing the mapping\n\n")
                     for p1, p2 in match.items():
-                        dumpfile.write("{} --- {}\n".format(str(the_graph.nodes[p1]["person"]),
-                                                            str(the_graph.nodes[p2]["person"])))
-
-            for p1, p2 in match.items():
-                # get pre-merge predecessors and successors for later use
-                p1_succ = {node for node in the_graph.successors(p1)
-                           if not the_graph.nodes[node]["person"].merged}
-                p1_pred = {node for node in the_graph.predecessors(p1)
-                           if not the_graph.nodes[node]["person"].merged}
-                p2_succ = {node for node in the_graph.successors(p2)
-                           if not the_graph.nodes[node]["person"].merged}
-                p2_pred = {node for node in the_graph.predecessors(p2)
-                           if not the_graph.nodes[node]["person"].merged}
-
-                try:  # check to make sure edge merge will actually work before committing
+                        dump_parts.append("{} --- {}\n".format(str(the_graph.nodes[p1]["person"]),
+                                                               str(the_graph.nodes[p2]["person"])))
+
+                # get the pre-merge relations of all matched persons to their alive successors and predecessors (keyed
+                # by neighbor) in one pass. These are kept up to date below as edges are rerouted, so that each edge is
+                # only looked up in the graph once.
+                alive = the_graph_model.alive
+                # the persons of the new twig that have not been merged away, kept up to date below
+                new_twig_alive = set(new_twig)
+                out_relations = {}
+                in_relations = {}
+                for person in itertools.chain(match.keys(), match.values()):
+                    out_relations[person] = {n: data["relation"] for n, data in the_graph.succ[person].items()
+                                             if n in alive}
+                    in_relations[person] = {n: data["relation"] for n, data in the_graph.pred[person].items()
+                                            if n in alive}
+
+                for p1, p2 in match.items():
+                    p1_out, p1_in = out_relations[p1], in_relations[p1]
+                    p2_out, p2_in = out_relations[p2], in_relations[p2]
+                    p1_succ, p1_pred, p2_succ, p2_pred = p1_out.keys(), p1_in.keys(), p2_out.keys(), p2_in.keys()
+
+                    try:  # check to make sure edge merge will actually work before committing
+                        for neighbor in p1_succ & p2_succ:
+                            if not p1_out[neighbor].can_merge(p2_out[neighbor], from_id="merged"):
+                                raise ValueError("cannot merge relations to {}".format(neighbor))
+                        for neighbor in p1_pred & p2_pred:
+                            if not p1_in[neighbor].can_merge(p2_in[neighbor], to_id="merged"):
+                                raise ValueError("cannot merge relations from {}".format(neighbor))
+                    except ValueError:
+                        logger.warning("aborting due to edge merge error")
+                        if spew:
+                            print("\nMERGE ERROR\n")
+                        break
+
+                    # merge nodes
+                    merged_person, p1_merge_rel, p2_merge_rel = the_graph.nodes[p1]["person"]. \
+                        merge(the_graph.nodes[p2]["person"])
+                    merged_id = merged_person.identifier
+                    the_graph_model.add_person(merged_person)
+                    the_graph_model.mark_merged(p1)
+                    the_graph_model.mark_merged(p2)
+                    twigs.union(merged_id, p1, p2)
+                    for old_id in (p1, p2):
+                        target_twig.discard(old_id)
+                        new_twig_alive.discard(old_id)
+                    the_graph.add_edge(p1_merge_rel.from_id, p1_merge_rel.to_id, relation=p1_merge_rel)
+                    the_graph.add_edge(p2_merge_rel.from_id, p2_merge_rel.to_id, relation=p2_merge_rel)
+                    target_twig.add(merged_id)
+
+                    # reroute or merge edges, collecting the changes so that the graph is only modified twice
+                    old_edges = []
+                    new_edges = []
+                    for old_id, relations, neighbors in ((p1, p1_out, p1_succ - p2_succ),
+                                                         (p2, p2_out, p2_succ - p1_succ)):
+                        for neighbor in neighbors:
+                            relation = relations[neighbor]
+                            relation.from_id = merged_id
+                            old_edges.append((old_id, neighbor))
+                            new_edges.append((merged_id, neighbor, {"relation": relation}))
+                    for old_id, relations, neighbors in ((p1, p1_in, p1_pred - p2_pred),
+                                                         (p2, p2_in, p2_pred - p1_pred)):
+                        for neighbor in neighbors:
+                            relation = relations[neighbor]
+                            relation.to_id = merged_id
+                            old_edges.append((neighbor, old_id))
+                            new_edges.append((neighbor, merged_id, {"relation": relation}))
+
                     for neighbor in p1_succ & p2_succ:
-                        test_relation1 = deepcopy(the_graph.edges[p1, neighbor]["relation"])
-                        test_relation1.from_id = "merged"
-                        test_relation2 = deepcopy(the_graph.edges[p2, neighbor]["relation"])
-                        test_relation2.from_id = "merged"
-                        test_relation1.merge(test_relation2)
+                        relation1 = p1_out[neighbor]
+                        relation1.from_id = merged_id
+                        relation2 = p2_out[neighbor]
+                        relation2.from_id = merged_id
+                        old_edges.extend([(p1, neighbor), (p2, neighbor)])
+                        new_edges.append((merged_id, neighbor, {"relation": relation1.merge(relation2)}))
                     for neighbor in p1_pred & p2_pred:
-                        test_relation1 = deepcopy(the_graph.edges[neighbor, p1]["relation"])
-                        test_relation1.to_id = "merged"
-                        test_relation2 = deepcopy(the_graph.edges[neighbor, p2]["relation"])
-                        test_relation2.to_id = "merged"
-                        test_relation1.merge(test_relation2)
-                except ValueError:
-                    logger.warning("aborting due to edge merge error")
-                    if spew:
-                        print("\nMERGE ERROR\n")
-                    break
-
-                # merge nodes
-                merged_person, p1_merge_rel, p2_merge_rel = the_graph.nodes[p1]["person"]. \
-                    merge(the_graph.nodes[p2]["person"])
-                merged_id = merged_person.identifier
-                the_graph.add_node(merged_id, person=merged_person)
-                the_graph.add_edge(p1_merge_rel.from_id, p1_merge_rel.to_id, relation=p1_merge_rel)
-                the_graph.add_edge(p2_merge_rel.from_id, p2_merge_rel.to_id, relation=p2_merge_rel)
-                target_twig.append(merged_id)
-
-                # reroute or merge edges
-                for neighbor in p1_succ - p2_succ:
-                    relation = the_graph.edges[p1, neighbor]["relation"]
-                    relation.from_id = merged_id
-                    the_graph.remove_edge(p1, neighbor)
-                    the_graph.add_edge(merged_id, neighbor, relation=relation)
-                for neighbor in p2_succ - p1_succ:
-                    relation = the_graph.edges[p2, neighbor]["relation"]
-                    relation.from_id = merged_id
-                    the_graph.remove_edge(p2, neighbor)
-                    the_graph.add_edge(merged_id, neighbor, relation=relation)
-                for neighbor in p1_pred - p2_pred:
-                    relation = the_graph.edges[neighbor, p1]["relation"]
-                    relation.to_id = merged_id
-                    the_graph.remove_edge(neighbor, p1)
-                    the_graph.add_edge(neighbor, merged_id, relation=relation)
-                for neighbor in p2_pred - p1_pred:
-                    relation = the_graph.edges[neighbor, p2]["relation"]
-                    relation.to_id = merged_id
-                    the_graph.remove_edge(neighbor, p2)
-                    the_graph.add_edge(neighbor, merged_id, relation=relation)
-
-                for neighbor in p1_succ & p2_succ:
-                    relation1 = the_graph.edges[p1, neighbor]["relation"]
-                    relation1.from_id = merged_id
-                    relation2 = the_graph.edges[p2, neighbor]["relation"]
-                    relation2.from_id = merged_id
-                    merged_relation = relation1.merge(relation2)
-                    the_graph.remove_edge(p1, neighbor)
-                    the_graph.remove_edge(p2, neighbor)
-                    the_graph.add_edge(merged_id, neighbor, relation=merged_relation)
-                for neighbor in p1_pred & p2_pred:
-                    relation1 = the_graph.edges[neighbor, p1]["relation"]
-                    relation1.to_id = merged_id
-                    relation2 = the_graph.edges[neighbor, p2]["relation"]
-                    relation2.to_id = merged_id
-                    merged_relation = relation1.merge(relation2)
-                    the_graph.remove_edge(neighbor, p1)
-                    the_graph.remove_edge(neighbor, p2)
-                    the_graph.add_edge(neighbor, merged_id, relation=merged_relation)
-
-            # add any additional component nodes to target
-            for person in new_twig:
-                if person not in target_twig:
-                    target_twig.append(person)
-
-            # we're done, no need to look for further matches
-            target_twig = [person for person in target_twig if not the_graph.nodes[person]["person"].merged]
-            processed_twigs[target_key] = target_twig
-            merge_successful = True
-            sanity_check(the_graph_model.graph)
-            if spew:
-                with open("twigdump_{}".format(target_key), "a") as dumpfile:
-                    dumpfile.write("\n\n------------------- merge result ------------------------\n")
-                    dumpfile.write(twig_dump(target_twig, the_graph))
-            break
-
-        if not merge_successful:
-            id = add_processed_twig(new_twig, new_twig_surnames, processed_twigs, surname_index)
-            if spew:
-                with open("twigdump_{}".format(id), "a") as dumpfile:
-                    dumpfile.write("initializing with")
-                    dumpfile.write(twig_dump(processed_twigs[id], the_graph))
-
-    logger.warning("finished")
+                        relation1 = p1_in[neighbor]
+                        relation1.to_id = merged_id
+                        relation2 = p2_in[neighbor]
+                        relation2.to_id = merged_id
+                        old_edges.extend([(neighbor, p1), (neighbor, p2)])
+                        new_edges.append((neighbor, merged_id, {"relation": relation1.merge(relation2)}))
+
+                    the_graph.remove_edges_from(old_edges)
+                    the_graph.add_edges_from(new_edges)
+                    for u, v in old_edges:
+                        if u in out_relations:
+                            del out_relations[u][v]
+                        if v in in_relations:
+                            del in_relations[v][u]
+                    for u, v, data in new_edges:
+                        if u in out_relations:
+                            out_relations[u][v] = data["relation"]
+                        if v in in_relations:
+                            in_relations[v][u] = data["relation"]
+
+                # add any additional component nodes to target
+                target_twig |= new_twig_alive
+
+                # we're done, no need to look for further matches
+                # targets stay indexed under the surnames of the twig they were created from
+                processed_twigs[target_key] = (target_twig, target_twig_surnames)
+                twig_cache.pop(target_key, None)
+                merge_successful = True
+                sanity_check(the_graph_model.graph)
+                if spew:
+                    dump_parts.append("\n\n------------------- merge result ------------------------\n")
+                    dump_parts.append(twig_dump(target_twig, the_graph))
+                    append_dump(target_key, dump_parts)
+                break
+
+            if not merge_successful:
+                id = add_processed_twig(new_twig, new_twig_surnames, processed_twigs, surname_index)
+                if spew:
+                    append_dump(id, ["initializing with", twig_dump(processed_twigs[id][0], the_graph)])
+
+    logger.warning("finished with %s twigs", len({twigs[node] for node in the_graph_model.alive}))
     sanity_check(the_graph_model.graph)
-    with open('dum2.json', 'w') as json_file:
-        json.dump(the_graph_model.json(), json_file, indent=2)
+    write_json(the_graph_model.json(), 'dum2.json')
 
 
 if __name__ == "__main__":
@@ -1,6 +1,14 @@
+import datetime
+import itertools
+import logging
 import math
+from collections import defaultdict
+from operator import attrgetter
 from data_model import *
 
+# the comparison functions are called for very many pairs of Persons, so the logger is only looked up once
+logger = logging.getLogger(__name__)
+
 
 def thing_match(thing1, thing2, total_count, total_comp, increment=1.0):
     if thing1 is None or thing2 is None:
@@ -25,16 +33,10 @@ def compare_name_part(name1: Name, name2: Name, part: str):
     else:
         raise ValueError
 
-    raw1 = name1.name_parts.get(part)
-    raw2 = name2.name_parts.get(part)
-
     if standard1 and standard2:
-        if standard1 == standard2:
-            return True
-        else:
-            return False
+        return standard1 == standard2
     else:
-        # TODO do fuzzy matches on raw names
+        # TODO do fuzzy matches on raw names (name_parts[part])
         return None
 
 
@@ -51,21 +53,29 @@ def compare_fullname(name1: Name, name2: Name, disqualify_surname_mismatch=False
         same person-in-real-life, and None otherwise.
 
     """
+    if not name1 or not name2:
+        return None
+    return compare_standard_names((name1.standard_given, name1.standard_surname),
+                                  (name2.standard_given, name2.standard_surname), disqualify_surname_mismatch)
+
+
+def compare_standard_names(standard1, standard2, disqualify_surname_mismatch=False):
+    """Compare two (standard_given, standard_surname) pairs in the same way as compare_fullname()."""
+    given1, surname1 = standard1
+    given2, surname2 = standard2
     matches = 0
-    given_comp = compare_name_part(name1, name2, "given")
-    surname_comp = compare_name_part(name1, name2, "surname")
 
-    if given_comp is not None:
-        if given_comp:
+    if given1 and given2:
+        if given1 == given2:
             matches += 1
         else:
             return False
 
-    if surname_comp is not None:
-        if disqualify_surname_mismatch and not surname_comp:
-            return False
-        if surname_comp:
+    if surname1 and surname2:
+        if surname1 == surname2:
             matches += 1
+        elif disqualify_surname_mismatch:
+            return False
 
     if matches == 2:
         return True
@@ -74,29 +84,38 @@ def compare_fullname(name1: Name, name2: Name, disqualify_surname_mismatch=False
 
 
 def name_match(names1, names2):
+    """Compare two dicts of Names, as returned by Person.get_names(). See name_key_match()."""
+    return name_key_match(name_key(names1), name_key(names2))
+
+
+def name_key_match(key1, key2):
+    """Compare the standardized names of two persons.
+
+    Args:
+        key1: The name key of the first person, as returned by Person.name_key().
+        key2: The name key of the second person.
+
+    Returns:
+        A tuple containing the number of matching name pairs and the number of comparisons made, or (-1, 0) if the
+        names show that the two cannot be the same person-in-real-life.
+    """
     matches = 0
     comparisons = 0
 
-    if not names1 or not names2:
-        return 0, 0
-
-    birth1 = names1.pop("birth", [None])[0]
-    birth2 = names2.pop("birth", [None])[0]
+    birth1, names1list = key1
+    birth2, names2list = key2
 
     if birth1 and birth2:
-        comp = compare_fullname(birth1, birth2, disqualify_surname_mismatch=True)
+        comp = compare_standard_names(birth1, birth2, disqualify_surname_mismatch=True)
         comparisons += 1
         if comp:
             matches += 1
         elif comp is False:
             return -1, 0
 
-    names1list = [item for sublist in [names1[k] for k in ("married", "unknown") if k in names1] for item in sublist]
-    names2list = [item for sublist in [names2[k] for k in ("married", "unknown") if k in names2] for item in sublist]
-
     for name1 in names1list:
         for name2 in names2list:
-            comp = compare_fullname(name1, name2)
+            comp = compare_standard_names(name1, name2)
             comparisons += 1
             if comp:
                 matches += 1
@@ -105,7 +124,7 @@ def name_match(names1, names2):
 
     if birth1:
         for name2 in names2list:
-            comp = compare_fullname(birth1, name2)
+            comp = compare_standard_names(birth1, name2)
             comparisons += 1
             if comp:
                 matches += 1
@@ -114,7 +133,7 @@ def name_match(names1, names2):
 
     if birth2:
         for name1 in names1list:
-            comp = compare_fullname(name1, birth2)
+            comp = compare_standard_names(name1, birth2)
             comparisons += 1
             if comp:
                 matches += 1
@@ -137,68 +156,64 @@ def datelist_overlap(datelist1, datelist2):
     """Determine if two lists of Date objects could possibly represent the same event, i.e. at least one interval
         in datelist1 has a non-empty intersection with at least one interval in datelist2."""
 
-    for date1 in datelist1:
-        for date2 in datelist2:
-            if date_overlap(date1, date2):
+    # each Date is converted to an integer interval once, rather than once for every pair
+    return bounds_overlap([date.interval() for date in datelist1], [date.interval() for date in datelist2])
+
+
+def bounds_overlap(bounds1, bounds2):
+    """Equivalent to datelist_overlap() for Dates that have been converted to intervals by Date.interval()."""
+
+    for first1, last1 in bounds1:
+        for first2, last2 in bounds2:
+            if first1 <= last2 and first2 <= last1:
                 return True
 
     return False
 
 
+# returned by earliest() and latest() when no Date in the list is earlier or later, respectively
+EARLIEST_DEFAULT = Date("2020-01-01")
+LATEST_DEFAULT = Date("1492-01-01")
+
+
 def earliest(datelist):
-    out = Date("2020-01-01")
-    for date in datelist:
-        if date.start < out.start:
-            out = date
-    return out
+    out = min(datelist, key=attrgetter("start"), default=EARLIEST_DEFAULT)
+    return out if out.start < EARLIEST_DEFAULT.start else EARLIEST_DEFAULT
 
 
 def latest(datelist):
-    out = Date("1492-01-01")
-    for date in datelist:
-        if date.end > out.end:
-            out = date
-    return out
+    out = max(datelist, key=attrgetter("end"), default=LATEST_DEFAULT)
+    return out if out.end > LATEST_DEFAULT.end else LATEST_DEFAULT
 
 
 def birth_death_match(person1: Person, person2: Person):
-    birth1 = person1.birth_date()
-    birth2 = person2.birth_date()
-    death1 = person1.death_date()
-    death2 = person2.death_date()
+    birth1, death1 = person1.date_bounds()
+    birth2, death2 = person2.date_bounds()
 
+    # every check that is made either matches or rules out the pair, so matches and comparisons are the same
     comparisons = 0
-    matches = 0
 
     if birth1 and birth2:
-        comparisons += 1
-        if datelist_overlap(birth1, birth2):
-            matches += 1
-        else:
+        if not bounds_overlap(birth1, birth2):
             return -1, 0
+        comparisons += 1
 
     if death1 and death2:
-        comparisons += 1
-        if datelist_overlap(death1, death2):
-            matches += 1
-        else:
+        if not bounds_overlap(death1, death2):
             return -1, 0
+        comparisons += 1
 
     if birth1 and death2:
-        comparisons += 1
-        if earliest(birth1).is_before(latest(death2)):
-            matches += 1
-        else:
+        if not earliest(person1.birth_date()).is_before(latest(person2.death_date())):
             return -1, 0
+        comparisons += 1
 
     if birth2 and death1:
-        comparisons += 1
-        if earliest(birth2).is_before(latest(death1)):
-            matches += 1
-        else:
+        if not earliest(person2.birth_date()).is_before(latest(person1.death_date())):
             return -1, 0
+        comparisons += 1
 
-    return matches, comparisons
+    return comparisons, comparisons
 
 
 def compare_location(loc1: Location, loc2: Location):
@@ -210,24 +225,27 @@ def compare_location(loc1: Location, loc2: Location):
     if loc1.alt_village != loc2.alt_village:
         return False
 
-    matching_values = [value for value in [loc1.house_number, loc1.alt_house_number] if value in
-                                                                         [loc2.house_number, loc2.alt_house_number]
-                                                                         and value is not None]
-    if matching_values:
-        return True
-    else:
-        return False
+    return not loc1.house_numbers().isdisjoint(loc2.house_numbers())
 
 
 def location_match(locations1, locations2):
     """Examine two lists of locations for consistency.
+
+    Returns:
+        The number of pairs of Locations (one from each list) that are consistent in the sense of compare_location().
     """
     matches = 0
 
     if locations1 and locations2:
+        # Locations can only be consistent within the same village, so the second list is grouped by village and
+        # reduced to sets of house numbers
+        house_numbers = defaultdict(list)
+        for loc2 in locations2:
+            house_numbers[loc2.alt_village].append(loc2.house_numbers())
         for loc1 in locations1:
-            for loc2 in locations2:
-                if location_match(loc1, loc2):
+            numbers1 = loc1.house_numbers()
+            for numbers2 in house_numbers.get(loc1.alt_village, ()):
+                if not numbers1.isdisjoint(numbers2):
                     matches += 1
 
     return matches
@@ -236,25 +254,30 @@ def location_match(locations1, locations2):
 def compare_person(person1, person2, graph=None):
     """Determine if two Person objects could be the same person-in-real-life in the context of a relationship graph.
     """
-    logger = logging.getLogger(__name__)
-    logger.debug("comparing %s to %s", person1, person2)
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug("comparing %s to %s", person1, person2)
 
-    if person1.has_fact("Stillbirth") or person2.has_fact("Stillbirth"):
-        logger.debug("Stillbirth")
+    if person1.gender != person2.gender:
+        if debug:
+            logger.debug("Gender mismatch")
         return 0, None, None
 
-    if person1.gender != person2.gender:
-        logger.debug("Gender mismatch")
+    if person1.has_fact("Stillbirth") or person2.has_fact("Stillbirth"):
+        if debug:
+            logger.debug("Stillbirth")
         return 0, None, None
 
-    name_matches, name_comparisons = name_match(person1.get_names(), person2.get_names())
+    name_matches, name_comparisons = name_key_match(person1.name_key(), person2.name_key())
     if name_matches == -1:
-        logger.debug("Name mismatch")
+        if debug:
+            logger.debug("Name mismatch")
         return 0, None, None
 
     date_matches, date_comparisons = birth_death_match(person1, person2)
     if date_matches == -1:
-        logger.debug("Date mismatch")
+        if debug:
+            logger.debug("Date mismatch")
         return 0, None, None
 
     if person1.has_fact("Coelebs"):
@@ -262,43 +285,165 @@ def compare_person(person1, person2, graph=None):
             relations = graph.direct_relations(person2.identifier)
         else:
             relations = {}
-        names = person2.get_names()
-        if "spouses" in relations or "married" in names:
-            logger.debug("Inconsistent marital status for %s and %s", person1, person2)
+        if "spouses" in relations or person2.has_name("married"):
+            if debug:
+                logger.debug("Inconsistent marital status for %s and %s", person1, person2)
             return 0, None, None
 
     if person2.has_fact("Coelebs"):
         relations = graph.direct_relations(person1.identifier)
-        names = person1.get_names()
-        if "spouses" in relations or "married" in names:
-            logger.debug("Inconsistent marital status for %s and %s", person1, person2)
+        if "spouses" in relations or person1.has_name("married"):
+            if debug:
+                logger.debug("Inconsistent marital status for %s and %s", person1, person2)
             return 0, None, None
 
     return name_matches, date_matches, location_match(person1.get_locations(), person2.get_locations())
 
 
+def mismatch_key(person):
+    """Return the attributes of a Person that must be equal for person_mismatch() to return False.
+
+    This allows obviously incompatible pairs of Persons to be discarded in bulk, before calling person_mismatch().
+
+    Returns:
+        None if the Person is a stillbirth (and so mismatches every other Person), and a tuple otherwise.
+    """
+    if person.has_fact("Stillbirth"):
+        return None
+    return (person.gender,)
+
+
+def mismatch_reason(person1, person2):
+    """Find why two Person objects cannot be the same person-in-real-life, cheapest checks first.
+
+    Only attributes that are cached on the Persons are used (see mismatch_key(), Person.name_key() and
+    Person.date_bounds()), and nothing is logged, since this is evaluated for very many pairs.
+
+    Returns:
+        A short description of the first mismatch found, or None if the two Persons could be the same.
+    """
+    if person1.gender != person2.gender:
+        return "Gender mismatch"
+
+    if person1.has_fact("Stillbirth") or person2.has_fact("Stillbirth"):
+        return "Stillbirth"
+
+    if name_key_match(person1.name_key(), person2.name_key())[0] == -1:
+        return "Name mismatch"
+
+    if birth_death_match(person1, person2)[0] == -1:
+        return "Date mismatch"
+
+    return None
+
+
 def person_mismatch(person1, person2):
     """Return True if two Person objects cannot be the same person-in-real-life.
     """
-    logger = logging.getLogger(__name__)
-    logger.debug("comparing %s to %s for mismatch", person1, person2)
+    reason = mismatch_reason(person1, person2)
+    if reason is None:
+        return False
 
-    if person1.has_fact("Stillbirth") or person2.has_fact("Stillbirth"):
-        logger.debug("Stillbirth")
-        return True
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s between %s and %s", reason, person1, person2)
+    return True
 
-    if person1.gender != person2.gender:
-        logger.debug("Gender mismatch")
-        return True
 
-    name_matches, name_comparisons = name_match(person1.get_names(), person2.get_names())
-    if name_matches == -1:
-        logger.debug("Name mismatch")
-        return True
+def blocking_keys(person, prefix_length=4):
+    """Return the blocking keys of a Person, as used by build_blocking_index().
 
-    date_matches, date_comparisons = birth_death_match(person1, person2)
-    if date_matches == -1:
-        logger.debug("Date mismatch")
-        return True
+    A key consists of the mismatch_key() of the Person, the first prefix_length characters of one of its
+    standardized surnames, and one of the decades that its birth or death Dates (including their accuracy) fall
+    into. A missing surname is represented by None, as is the decade of a Person with neither a birth nor a death
+    Date. Blocking is approximate: two Persons whose surnames were standardized to different prefixes, or of whom
+    one only has a birth Date and the other only a death Date, share no key even though person_mismatch() might
+    accept them.
 
-    return False
+    Args:
+        person (Person): The Person.
+        prefix_length (int): The number of leading characters of the standardized surnames to use.
+
+    Returns:
+        A set of tuples, which is empty if the Person cannot match anyone (see mismatch_key()).
+    """
+    key = mismatch_key(person)
+    if key is None:
+        return set()
+
+    surnames = {surname[:prefix_length] for surname in person.standardized_surnames() if surname} or {None}
+
+    decades = set()
+    for bounds in person.date_bounds():
+        if bounds:
+            first = max(min(bound[0] for bound in bounds), datetime.date.min.toordinal())
+            last = min(max(bound[1] for bound in bounds), datetime.date.max.toordinal())
+            decades.update(range(datetime.date.fromordinal(first).year // 10,
+                                 datetime.date.fromordinal(last).year // 10 + 1))
+    if not decades:
+        decades = {None}
+
+    return {key + (surname, decade) for surname in surnames for decade in decades}
+
+
+def build_blocking_index(persons, prefix_length=4):
+    """Group Persons by their blocking keys, so that only Persons sharing a key need to be compared pairwise.
+
+    Args:
+        persons: An iterable of Persons.
+        prefix_length (int): See blocking_keys().
+
+    Returns:
+        A dict mapping each blocking key to the set of identifiers of the Persons that have it.
+    """
+    index = defaultdict(set)
+    for person in persons:
+        for key in blocking_keys(person, prefix_length):
+            index[key].add(person.identifier)
+    return index
+
+
+def candidate_pairs(index):
+    """Generate the distinct pairs of Person identifiers that share at least one key of a blocking index.
+
+    Args:
+        index (dict): A blocking index, as returned by build_blocking_index().
+
+    Yields:
+        (identifier, identifier) tuples, with the smaller identifier first. Each pair is yielded only once.
+    """
+    seen = set()
+    for identifiers in index.values():
+        for pair in itertools.combinations(sorted(identifiers), 2):
+            if pair not in seen:
+                seen.add(pair)
+                yield pair
+
+
+def sorted_neighborhood_pairs(persons, window=5):
+    """Generate pairs of Person identifiers with the sorted neighborhood method.
+
+    The Persons are sorted by standardized surname and given name (of the birth Name if there is one, otherwise of
+    their first Name), and every Person is paired with the following window - 1 Persons. Unlike blocking on
+    surname prefixes, this still pairs Persons whose surnames were standardized to slightly different spellings, so
+    the two can be combined by taking the union of their pairs. Persons that cannot match anyone (see mismatch_key())
+    are left out.
+
+    Args:
+        persons: An iterable of Persons.
+        window (int): The size of the sliding window.
+
+    Yields:
+        (identifier, identifier) tuples, with the smaller identifier first.
+    """
+    keys = []
+    for person in persons:
+        if mismatch_key(person) is None:
+            continue
+        birth_name, other_names = person.name_key()
+        given, surname = birth_name or (other_names[0] if other_names else (None, None))
+        keys.append((surname or "", given or "", person.identifier))
+    keys.sort()
+
+    for i in range(len(keys)):
+        for j in range(i + 1, min(i + window, len(keys))):
+            yield tuple(sorted((keys[i][2], keys[j][2])))
@@ -30,9 +30,10 @@ Ref: https://github.com/FamilySearch/gedcomx/blob/master/specifications/conceptu
 """
 
 import datetime
-import uuid
+import os
 import logging
 import json
+import sys
 from collections import defaultdict
 from copy import deepcopy
 
@@ -49,15 +50,14 @@ class Statement:
         json_dict (dict or None): Serialization from which to import.
     """
 
+    __slots__ = ("notes", "confidence")
+
     def __init__(self, notes=None, confidence="normal", json_dict=None):
         if json_dict:
-            self.confidence = json_dict.get("confidence", None)
+            self.confidence = intern_string(json_dict.get("confidence", None))
             self.notes = json_dict.get("notes", None)
         else:
-            if type(notes) is list or notes is None:
-                self.notes = notes
-            else:
-                self.notes = [notes]
+            self.notes = as_list(notes)
 
             self.confidence = confidence
 
@@ -92,6 +92,8 @@ class Conclusion(Statement):
         notes (str or list of str or None): Note(s) about this conclusion.
         json_dict (dict or None): Serialization from which to import.
     """
+    __slots__ = ("sources",)
+
     def __init__(self, sources=None, notes=None, confidence="normal", json_dict=None):
         if json_dict:
             super().__init__(json_dict=json_dict)
@@ -101,15 +103,12 @@ class Conclusion(Statement):
                 self.sources = None
         else:
             super().__init__(notes=notes, confidence=confidence)
-            if type(sources) is list or sources is None:
-                self.sources = sources
-            else:
-                self.sources = [sources]
+            self.sources = as_list(sources)
 
     def json(self):
         output = {}
         if self.sources:
-            output.update({"sources": [x.json() for x in self.sources]})
+            output["sources"] = [x.json() for x in self.sources]
         output.update(super().json())
         return output
 
@@ -153,11 +152,13 @@ class Fact(Conclusion):
         date (Date or list of Date)
         age (Duration or list of Duration)
     """
+    __slots__ = ("fact_type", "content", "date", "age", "locations")
+
     def __init__(self, fact_type, date=None, age=None, locations=None, content=None,
                  sources=None, notes=None, confidence="normal", json_dict=None):
         if json_dict:
             super().__init__(json_dict=json_dict)
-            self.fact_type = json_dict["fact_type"]
+            self.fact_type = intern_string(json_dict["fact_type"])
             if "date" in json_dict:
                 self.date = [Date("dummy", json_dict=x) for x in json_dict["date"]]
             else:
@@ -189,30 +190,26 @@ class Fact(Conclusion):
             else:
                 self.age = []
 
-            if type(locations) is list or locations is None:
-                self.locations = locations
-            else:
-                self.locations = [locations]
+            self.locations = as_list(locations)
 
     def json(self):
         output = {"fact_type": self.fact_type}
         if self.content:
-            output.update({"content": self.content})
+            output["content"] = self.content
         if self.age:
-            output.update({"age": [x.json() for x in self.age]})
+            output["age"] = [x.json() for x in self.age]
         if self.date:
-            output.update({"date": [x.json() for x in self.date]})
+            output["date"] = [x.json() for x in self.date]
         if self.locations:
-            output.update({"locations": [x.json() for x in self.locations]})
+            output["locations"] = [x.json() for x in self.locations]
         output.update(super().json())
         return output
 
     def __str__(self):
-        top_line = format(self.fact_type)
         if self.content:
-            top_line = top_line + " = {}".format(self.content)
-        top_line = top_line + "\n"
-        output = [top_line]
+            output = ["{} = {}\n".format(self.fact_type, self.content)]
+        else:
+            output = ["{}\n".format(self.fact_type)]
         if self.date:
             output.append("\tDate: {}\n".format(str(self.date)))
         if self.age:
@@ -252,20 +249,22 @@ class Name(Conclusion):
         thesaurus (dict): The thesaurus to be used to standardize name parts. The keys consist of non-standard forms,
             and the values are the standardized from.
     """
-    __name_order = ["prefix", "given", "surname", "suffix", "house"]
+    __name_order = ("prefix", "given", "surname", "suffix", "house")
+
+    __slots__ = ("name_type", "name_parts", "date", "standard_given", "standard_surname")
 
     def __init__(self, name_type, name_parts, date=None, sources=None, notes=None,
                  confidence="normal", thesaurus=None, json_dict=None):
         if json_dict:
             super().__init__(json_dict=json_dict)
-            self.name_type = json_dict["name_type"]
+            self.name_type = intern_string(json_dict["name_type"])
             self.name_parts = json_dict["name_parts"]
             if "date" in json_dict:
                 self.date = Date("dummy", json_dict=json_dict["date"])
             else:
                 self.date = None
-            self.standard_surname = json_dict.get("standard_surname", None)
-            self.standard_given = json_dict.get("standard_given", None)
+            self.standard_surname = intern_string(json_dict.get("standard_surname", None))
+            self.standard_given = intern_string(json_dict.get("standard_given", None))
         else:
             super().__init__(sources=sources, notes=notes, confidence=confidence)
             self.standard_given = None
@@ -274,27 +273,25 @@ class Name(Conclusion):
             self.name_parts = {k: v for k, v in name_parts.items() if v is not None}
             self.date = date
 
-            logger = logging.getLogger(__name__)
-
             if thesaurus:
-                if "given" in self.name_parts.keys():
-                    try:
-                        self.standard_given = thesaurus[self.name_parts["given"]]
-                    except KeyError:
-                        logger.info("key miss while standardizing given name '{}'".format(self.name_parts["given"]))
-
-                if "surname" in self.name_parts.keys():
-                    try:
-                        self.standard_surname = thesaurus[self.name_parts["surname"]]
-                    except KeyError:
-                        logger.info("key miss while standardizing surname '{}'".format(self.name_parts["surname"]))
+                given = self.name_parts.get("given")
+                if given is not None:
+                    self.standard_given = thesaurus.get(given)
+                    if self.standard_given is None:
+                        logging.getLogger(__name__).info("key miss while standardizing given name '{}'".format(given))
+
+                surname = self.name_parts.get("surname")
+                if surname is not None:
+                    self.standard_surname = thesaurus.get(surname)
+                    if self.standard_surname is None:
+                        logging.getLogger(__name__).info("key miss while standardizing surname '{}'".format(surname))
 
     def json(self):
         output = {"name_type": self.name_type, "name_parts": self.name_parts,
                   "standard_surname": self.standard_surname,
                   "standard_given": self.standard_given}
         if self.date:
-            output.update({"date": self.date.json()})
+            output["date"] = self.date.json()
         output.update(super().json())
         return output
 
@@ -302,9 +299,8 @@ class Name(Conclusion):
         if self.standard_given and self.standard_surname:
             return "{} {}".format(self.standard_given, self.standard_surname)
         else:
-            output = [self.name_parts[x] for x in Name.__name_order
-                      if x in self.name_parts and self.name_parts[x] is not None]
-            return " ".join(output)
+            name_parts = self.name_parts
+            return " ".join([part for part in map(name_parts.get, Name.__name_order) if part is not None])
 
     def __str__(self):
         return self.str_terse() + "({})".format(self.name_type)
@@ -324,6 +320,9 @@ class Person(Conclusion):
         names (Name or list of Name or None): The name(s) of the person
         facts (Fact or list of Fact or None): Fact(s) regarding the person.
     """
+    __slots__ = ("names", "gender", "facts", "identifier", "merged", "_standardized_surnames", "_name_key",
+                 "_names_by_type", "_facts_by_type", "_date_bounds")
+
     def __init__(self, names=None, gender=None, facts=None,
                  sources=None, notes=None, confidence="normal", json_dict=None):
         if json_dict:
@@ -332,7 +331,7 @@ class Person(Conclusion):
                 self.names = [Name(name_type=None, name_parts={}, json_dict=x) for x in json_dict["names"]]
             else:
                 self.names = None
-            self.gender = json_dict.get("gender", None)
+            self.gender = intern_string(json_dict.get("gender", None))
             if "facts" in json_dict:
                 self.facts = [Fact(fact_type=None, json_dict=x) for x in json_dict["facts"]]
             else:
@@ -342,6 +341,11 @@ class Person(Conclusion):
                 self.merged = True
             else:
                 self.merged = False
+            self._standardized_surnames = None
+            self._name_key = None
+            self._names_by_type = None
+            self._facts_by_type = None
+            self._date_bounds = None
         else:
             super().__init__(sources=sources, notes=notes, confidence=confidence)
             if names:
@@ -356,23 +360,25 @@ class Person(Conclusion):
             else:
                 self.names = None
 
-            if type(facts) is list or facts is None:
-                self.facts = facts
-            else:
-                self.facts = [facts]
+            self.facts = as_list(facts)
 
             self.gender = gender
-            self.identifier = str(uuid.uuid4())
+            self.identifier = new_identifier()
             self.merged = False
+            self._standardized_surnames = None
+            self._name_key = None
+            self._names_by_type = None
+            self._facts_by_type = None
+            self._date_bounds = None
 
     def json(self):
         output = {"identifier": self.identifier, "gender": self.gender}
         if self.names:
-            output.update({"names": [x.json() for x in self.names]})
+            output["names"] = [x.json() for x in self.names]
         if self.facts:
-            output.update({"facts": [x.json() for x in self.facts]})
+            output["facts"] = [x.json() for x in self.facts]
         if self.merged:
-            output.update({"merged": "True"})
+            output["merged"] = "True"
         output.update(super().json())
         return output
 
@@ -418,14 +424,12 @@ class Person(Conclusion):
         if facts is None:
             return
 
-        if type(facts) is not list and type(facts) is Fact:
+        if type(facts) is Fact:
             facts = [facts]
 
-        for fact in facts:
-            if self.facts is None:
-                self.facts = [fact]
-            else:
-                self.facts.append(fact)
+        self.facts = extend_list(self.facts, facts)
+        self._facts_by_type = None
+        self._date_bounds = None
 
     def add_name(self, names):
         if names is None:
@@ -438,13 +442,14 @@ class Person(Conclusion):
             if type(name) is not Name:
                 raise ValueError("only Name objects can be added as the name of a Person")
 
-            if self.names is None:
-                self.names = [name]
-            else:
-                self.names.append(name)
-                # TODO temporarily eliminate this checking to allow for simpler merging of Persons
-                # if len([n for n in self.names if n.name_type == "birth"]) > 1:
-                #     raise ValueError("a Person can only have one birth Name")
+        self.names = extend_list(self.names, names)
+        # TODO temporarily eliminate this checking to allow for simpler merging of Persons
+        # if len([n for n in self.names if n.name_type == "birth"]) > 1:
+        #     raise ValueError("a Person can only have one birth Name")
+
+        self._standardized_surnames = None
+        self._name_key = None
+        self._names_by_type = None
 
     def summarize(self):
         """A longer-form text summary of a Person object."""
@@ -467,11 +472,47 @@ class Person(Conclusion):
         return out
 
     def standardized_surnames(self):
-        out = set()
-        if self.names:
-            for name in self.names:
-                out = out | {name.standard_surname}
-        return out
+        """Return the set of standardized surnames of all Names of this Person.
+
+        The result is computed once and cached until another Name is added.
+
+        Returns:
+            frozenset of str
+        """
+        if self._standardized_surnames is None:
+            if self.names:
+                self._standardized_surnames = frozenset(name.standard_surname for name in self.names)
+            else:
+                self._standardized_surnames = frozenset()
+        return self._standardized_surnames
+
+    def name_key(self):
+        """Return the standardized name parts of this Person in the form used for name comparisons.
+
+        The result is computed once and cached until another Name is added.
+
+        Returns:
+            The tuple returned by name_key() for the Names of this Person.
+        """
+        if self._name_key is None:
+            self._name_key = name_key(self.names_by_type())
+        return self._name_key
+
+    def names_by_type(self):
+        """Return the Names of this Person grouped by name type.
+
+        Unlike get_names(), the result is cached (until another Name is added) and must not be modified by the
+        caller.
+
+        Returns:
+            dict with name types as keys and lists of Name as values
+        """
+        if self._names_by_type is None:
+            self._names_by_type = dict(self.get_names())
+        return self._names_by_type
+
+    def has_name(self, name_type):
+        return name_type in self.names_by_type()
 
     def get_facts(self):
         out = defaultdict(list)
@@ -480,11 +521,24 @@ class Person(Conclusion):
                 out[fact.fact_type].append(fact)
         return out
 
+    def facts_by_type(self):
+        """Return the Facts of this Person grouped by fact type.
+
+        Unlike get_facts(), the result is cached (until another Fact is added) and must not be modified by the
+        caller. It is used by the comparison functions, which query the same Persons many times.
+
+        Returns:
+            dict with fact types as keys and lists of Fact as values
+        """
+        if self._facts_by_type is None:
+            self._facts_by_type = dict(self.get_facts())
+        return self._facts_by_type
+
     def has_fact(self, fact):
-        return fact in self.get_facts().keys()
+        return fact in self.facts_by_type()
 
     def birth_date(self, flatten=False):
-        facts = self.get_facts()
+        facts = self.facts_by_type()
         if "Birth" in facts.keys():
             if len(facts["Birth"]) > 1:
                 raise ValueError("Person can have only one birth Fact.")
@@ -496,7 +550,7 @@ class Person(Conclusion):
             return None
 
     def death_date(self):
-        facts = self.get_facts()
+        facts = self.facts_by_type()
         if "Death" in facts.keys():
             if len(facts["Death"]) != 1:
                 raise ValueError("Person can have only one death Fact.")
@@ -504,6 +558,23 @@ class Person(Conclusion):
         else:
             return None
 
+    def date_bounds(self):
+        """Return the birth and death Dates of this Person as integer intervals.
+
+        Each Date is converted to the pair of proleptic Gregorian ordinals of Date.start - Date.accuracy and
+        Date.end + Date.accuracy, so that overlap tests are plain integer comparisons. The result is cached until
+        another Fact is added.
+
+        Returns:
+            A tuple containing a tuple of (first, last) ordinal pairs for the birth Dates and another for the death
+            Dates. Either is empty if there are no such Dates.
+        """
+        if self._date_bounds is None:
+            self._date_bounds = tuple(
+                tuple(date.interval() for date in dates) if dates else ()
+                for dates in (self.birth_date(), self.death_date()))
+        return self._date_bounds
+
     def get_locations(self):
         """Extract all distinct Locations from all Facts associated with this Person
 
@@ -618,13 +689,17 @@ class Relationship(Conclusion):
         facts (Fact or list of Fact or None): Fact(s) relating to the relationship, generally a birth/baptism
             or marriage.
     """
+    __slots__ = ("from_id", "to_id", "relationship_type", "identifier", "facts")
+
+    relationship_types = frozenset(("spouse", "parent-child", "merged-into"))
+
     def __init__(self, from_id, to_id, relationship_type, facts=None,
                  sources=None, notes=None, confidence="normal", json_dict=None):
         if json_dict:
             super().__init__(json_dict=json_dict)
             self.from_id = json_dict["from_id"]
             self.to_id = json_dict["to_id"]
-            self.relationship_type = json_dict["relationship_type"]
+            self.relationship_type = intern_string(json_dict["relationship_type"])
             self.identifier = json_dict["identifier"]
             if "facts" in json_dict:
                 self.facts = [Fact(fact_type=None, json_dict=x) for x in json_dict["facts"]]
@@ -632,25 +707,21 @@ class Relationship(Conclusion):
                 self.facts = None
         else:
             super().__init__(sources=sources, notes=notes, confidence=confidence)
-            if relationship_type != "spouse" and relationship_type != "parent-child" \
-                    and relationship_type != "merged-into":
+            if relationship_type not in Relationship.relationship_types:
                 raise ValueError("relationship_type must be 'spouse', 'parent-child', or 'merged-into'")
 
-            if type(facts) is list or facts is None:
-                self.facts = facts
-            else:
-                self.facts = [facts]
+            self.facts = as_list(facts)
 
             self.from_id = from_id
             self.to_id = to_id
             self.relationship_type = relationship_type
-            self.identifier = str(uuid.uuid4())
+            self.identifier = new_identifier()
 
     def json(self):
         output = {"identifier": self.identifier, "from_id": self.from_id, "to_id": self.to_id,
                   "relationship_type": self.relationship_type}
         if self.facts:
-            output.update({"facts": [x.json() for x in self.facts]})
+            output["facts"] = [x.json() for x in self.facts]
         output.update(super().json())
         return output
 
@@ -658,27 +729,31 @@ class Relationship(Conclusion):
         if facts is None:
             return
 
-        if type(facts) is not list:
-            facts = [facts]
-
-        for fact in facts:
-            if self.facts is None:
-                self.facts = [fact]
-            else:
-                self.facts.append(fact)
+        self.facts = extend_list(self.facts, as_list(facts))
 
     def add_note(self, notes):
         if notes is None:
             return
 
-        if type(notes) is not list:
-            notes = [notes]
+        self.notes = extend_list(self.notes, as_list(notes))
 
-        for note in notes:
-            if self.notes is None:
-                self.notes = [note]
-            else:
-                self.notes.append(note)
+    def can_merge(self, other, from_id=None, to_id=None):
+        """Determine if a Relationship object can be merged with the "self" Relationship, without modifying or
+            copying either of them.
+
+        Args:
+            other (Relationship): The Relationship that is to be merged with self.
+            from_id (str or None): If not None, the from_id that both Relationships will have after rerouting.
+            to_id (str or None): If not None, the to_id that both Relationships will have after rerouting.
+
+        Returns:
+            True if merge() would succeed, False otherwise.
+        """
+        if from_id is None and self.from_id != other.from_id:
+            return False
+        if to_id is None and self.to_id != other.to_id:
+            return False
+        return self.relationship_type == other.relationship_type
 
     def merge(self, other):
         """Merge a Relationship object with the "self" Relationship and returns the result.
@@ -741,6 +816,8 @@ class Location(Statement):
             in the metrical book entry. Otherwise, it should be None, and is assumed to be the village
             where the parish is located.
     """
+    __slots__ = ("house_number", "alt_house_number", "alt_village")
+
     def __init__(self, house_number=None, alt_house_number=None, alt_village=None, notes=None,
                  confidence="normal", json_dict=None):
         if json_dict:
@@ -781,6 +858,12 @@ class Location(Statement):
                and self.alt_house_number == other.alt_house_number \
                and self.alt_village == other.alt_village
 
+    def house_numbers(self):
+        """Return the set of house numbers (house_number and alt_house_number) of this Location that are not None."""
+        if self.alt_house_number is None:
+            return {self.house_number} if self.house_number is not None else set()
+        return {self.house_number, self.alt_house_number} - {None}
+
 
 class Date:
     """A date or date range of a genealogical event/fact.
@@ -806,10 +889,12 @@ class Date:
             object representing the end date of the interval. If the date range is to be unbounded from above,
             then it should be passed an empty string.
     """
+    __slots__ = ("start", "end", "accuracy", "notes")
+
     def __init__(self, start_val, end_val=None, accuracy=None, notes=None, json_dict=None):
         if json_dict:
-            self.start = datetime.datetime.strptime(json_dict["start"], "%Y-%m-%d").date()
-            self.end = datetime.datetime.strptime(json_dict["end"], "%Y-%m-%d").date()
+            self.start = parse_iso_date(json_dict["start"])
+            self.end = parse_iso_date(json_dict["end"])
             self.accuracy = datetime.timedelta(days=json_dict["accuracy"])
             self.notes = json_dict.get("notes", None)
         else:
@@ -817,7 +902,7 @@ class Date:
                 self.start = start_val
             else:
                 if start_val != "":
-                    self.start = datetime.datetime.strptime(start_val, "%Y-%m-%d").date()
+                    self.start = parse_iso_date(start_val)
                 else:
                     self.start = datetime.date.min
 
@@ -828,7 +913,7 @@ class Date:
                     self.end = end_val
                 else:
                     if end_val != "":
-                        self.end = datetime.datetime.strptime(end_val, "%Y-%m-%d").date()
+                        self.end = parse_iso_date(end_val)
                     else:
                         self.end = datetime.date.max
 
@@ -837,10 +922,7 @@ class Date:
             else:
                 self.accuracy = accuracy
 
-            if type(notes) is list or notes is None:
-                self.notes = notes
-            else:
-                self.notes = [notes]
+            self.notes = as_list(notes)
 
     def json(self):
         output = {"start": self.start.isoformat(), "end": self.end.isoformat(),
@@ -870,6 +952,10 @@ class Date:
     def is_before(self, other):
         return self.end < other.start
 
+    def interval(self):
+        """Return the proleptic Gregorian ordinals of start - accuracy and end + accuracy as a (first, last) tuple."""
+        return self.start.toordinal() - self.accuracy.days, self.end.toordinal() + self.accuracy.days
+
     def add_note(self, note):
         if self.notes is None:
             self.notes = [note]
@@ -916,33 +1002,38 @@ class Duration:
         precision (str or None): The precision of the duration (see Attributes above). If None, then
             the precision will be inferred from the duration_list.
     """
+    __slots__ = ("duration_list", "duration", "precision", "year_day_ambiguity", "notes")
+
+    # the precision corresponding to each element of duration_list
+    precisions = ("year", "month", "week", "day")
+    time_names = ("years", "months", "weeks", "days")
+
     def __init__(self, duration_list=None, precision=None, notes=None, year_day_ambiguity=None, json_dict=None):
         if json_dict:
             self.duration_list = json_dict["duration"]
-            self.precision = json_dict["precision"]
+            self.precision = intern_string(json_dict["precision"])
             self.year_day_ambiguity = json_dict["year_day_ambiguity"]
             self.notes = json_dict.get("notes", None)
         else:
             self.duration_list = duration_list
-            self.duration = datetime.timedelta(weeks=duration_list[2],
-                                               days=365*duration_list[0]+30*duration_list[1]+duration_list[3])
             if precision is None:
-                if sum(duration_list) == 0:
-                    self.precision = "day"
-                else:
-                    # find last non-zero element of reversed duration_list
-                    index = next(x for x, val in enumerate(reversed(duration_list)) if val > 0)
-                    self.precision = ["day", "week", "month", "year"][index]
+                # the precision is that of the last non-zero element of duration_list
+                self.precision = "day"
+                for index in range(3, -1, -1):
+                    if duration_list[index] > 0:
+                        self.precision = Duration.precisions[index]
+                        break
             else:
                 self.precision = precision
 
-            if type(notes) is list or notes is None:
-                self.notes = notes
-            else:
-                self.notes = [notes]
+            self.notes = as_list(notes)
 
             self.year_day_ambiguity = year_day_ambiguity
 
+        duration_list = self.duration_list
+        self.duration = datetime.timedelta(days=365 * duration_list[0] + 30 * duration_list[1] +
+                                           7 * duration_list[2] + duration_list[3])
+
     def json(self):
         output = {"duration": self.duration_list,
                   "precision": self.precision, "year_day_ambiguity": str(self.year_day_ambiguity)}
@@ -954,13 +1045,8 @@ class Duration:
         return json.dumps(self.json())
 
     def __str__(self):
-        time_names = ("years", "months", "weeks", "days")
-        output = []
-        for i in range(4):
-            if self.duration_list[i] == 0:
-                continue
-            output.append(str(self.duration_list[i]) + " " + time_names[i])
-        return ", ".join(output)
+        return ", ".join(str(value) + " " + name
+                         for value, name in zip(self.duration_list, Duration.time_names) if value != 0)
 
     def add_note(self, note):
         if self.notes is None:
@@ -979,6 +1065,8 @@ class Source:
         entry_number (int): The entry number of the record.
         image_file (str): The name of the image file in which the source record is located.
     """
+    __slots__ = ("repository", "volume", "page_number", "entry_number", "image_file")
+
     def __init__(self, repository=None, volume=None, page_number=None, entry_number=None,
                  image_file=None, json_dict=None):
         if json_dict:
@@ -1007,6 +1095,80 @@ class Source:
                                                               self.entry_number, self.image_file)
 
 
+def intern_string(value):
+    """Intern a string read from a serialization, passing anything else (e.g. None) through unchanged.
+
+    Types, genders, confidences and standardized names come from small vocabularies. Interning lets all occurrences
+    of a value share one object, which saves memory and lets equality tests succeed by identity.
+    """
+    if type(value) is str:
+        return sys.intern(value)
+    return value
+
+
+def as_list(value):
+    """Wrap a single item in a list, leaving lists and None as they are.
+
+    This is how the constructors treat arguments that can be given as either an object or a list of objects.
+    """
+    if value is None or type(value) is list:
+        return value
+    return [value]
+
+
+def extend_list(current, items):
+    """Add items to a list attribute that is None while empty, and return its new value.
+
+    The items are added with a single list.extend() (or copied into a new list if current is None). If there are no
+    items, current is returned as it is, so None stays None.
+    """
+    if current is None:
+        return list(items) or None
+    current.extend(items)
+    return current
+
+
+def parse_iso_date(date_string):
+    """Convert a "YYYY-MM-DD" string into a datetime.date.
+
+    datetime.date.fromisoformat() is much faster than strptime(), but it requires zero-padded fields and (since Python
+    3.11) also accepts other ISO 8601 forms such as "18500101" or "1850-W01-1". It is therefore only used for strings
+    of the exact "YYYY-MM-DD" shape, and everything else goes through strptime(), which accepts or rejects it as before.
+    """
+    if len(date_string) == 10 and date_string[4] == "-" and date_string[7] == "-":
+        try:
+            return datetime.date.fromisoformat(date_string)
+        except ValueError:
+            pass
+    return datetime.datetime.strptime(date_string, "%Y-%m-%d").date()
+
+
+def new_identifier():
+    """Return a new random identifier for a Person or Relationship.
+
+    The identifier is the hex string of 128 random bits, which is as unique as a UUID4 but several times faster to
+    generate, since no UUID object needs to be constructed and formatted.
+    """
+    return os.urandom(16).hex()
+
+
+def name_key(names):
+    """Reduce the Names of a person to the standardized name parts that are compared when matching persons.
+
+    Args:
+        names (dict): Lists of Names keyed by name type, as returned by Person.get_names().
+
+    Returns:
+        A tuple containing the (standard_given, standard_surname) pair of the birth Name (or None if there is no
+        birth Name), and a tuple of such pairs for all "married" and "unknown" Names.
+    """
+    birth = names.get("birth")
+    birth_key = (birth[0].standard_given, birth[0].standard_surname) if birth else None
+    other_keys = tuple((name.standard_given, name.standard_surname)
+                       for name_type in ("married", "unknown") for name in names.get(name_type, []))
+    return birth_key, other_keys
+
+
 def subtract(date, duration):
     """Subtract a Duration from a Date and return a new Date.
 
@@ -3,7 +3,8 @@
 The model is a directed graph implemented using the NetworkX package. Although nodes correspond to objects of type
 data_model.Person, since Person objects are mutable, the actual NetworkX nodes are the value of Person.identifier,
 and the actual Person object is stored in a dict indexed by identifier. Edges have the property "relation" which
-contain an object of type data_model.Relationship.
+contain an object of type data_model.Relationship. The identifiers of all Persons that have not been merged into
+another Person are kept in the set PeopleGraph.alive.
 """
 
 
@@ -20,6 +21,7 @@ class PeopleGraph:
     def __init__(self, graph_json=None):
         self.graph = nx.DiGraph()
         self.people = {}
+        self.alive = set()
 
         if graph_json:
             relations = []
@@ -33,6 +35,7 @@ class PeopleGraph:
             self.graph.add_nodes_from([(k, {"person": self.people[k]}) for k in self.people.keys()])
             # TODO the above is, of course, nuts. It's storing the same data twice...
             self.graph.add_edges_from(relations)
+            self.alive = {k for k, person in self.people.items() if not person.merged}
 
     def json(self):
         graph_json = {"persons": [self.graph.nodes[x]["person"].json() for x in self.graph.nodes], "relations": []}
@@ -45,9 +48,21 @@ class PeopleGraph:
 
     def append(self, record: Record):
         self.graph.add_nodes_from([(p.identifier, {"person": p}) for p in record.people()])
+        self.alive.update(p.identifier for p in record.people() if not p.merged)
         relations = [(rel.from_id, rel.to_id, {"relation": rel}) for rel in record.relations()]
         self.graph.add_edges_from(relations)
 
+    def add_person(self, person):
+        """Add a Person as a new node of the graph."""
+        self.graph.add_node(person.identifier, person=person)
+        self.people[person.identifier] = person
+        if not person.merged:
+            self.alive.add(person.identifier)
+
+    def mark_merged(self, pid):
+        """Remove a Person that has been merged into another Person from the set of alive Persons."""
+        self.alive.discard(pid)
+
     def summarize(self):
         print("{} nodes, {} edges, {} components".format(self.graph.number_of_nodes(),
                                                          self.graph.number_of_edges(),
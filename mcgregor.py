@@ -53,19 +53,89 @@ from collections import defaultdict
 import networkx as nx
 
 
+class FlatGraph:
+    """A snapshot of a graph in which the nodes are identified by consecutive integer indices.
+
+    mcgregor() flattens its input graphs into this form before searching, so that neighbor and edge lookups are
+    plain list and set operations rather than traversals of NetworkX's nested adjacency dicts. A FlatGraph can also
+    be constructed in advance and passed to mcgregor() directly, in which case the node order of the snapshot is
+    used throughout. The snapshot does not track later changes to the original graph.
+
+    Attributes:
+        graph (nx.Graph): The original graph.
+        directed (bool): True if the graph is directed.
+        nodes (list): The nodes of the graph, in the order of their integer indices.
+        index (dict): The integer index of each node.
+        succ (list of list): The indices of the successors of each node, excluding self-loops. For an undirected
+            graph, these are all of the neighbors of the node.
+        pred (list of list): The indices of the predecessors of each node, excluding self-loops. For an undirected
+            graph, this is the same as succ.
+        edges (set of tuple): The pairs of node indices of all edges. For an undirected graph, each edge is included
+            in both orientations.
+        succ_mask (list of int): The same information as succ, with the successors of each node encoded as a bitmask
+            (bit j is set if the node with index j is a successor).
+        pred_mask (list of int): The same information as pred, encoded as bitmasks.
+    """
+    def __init__(self, graph):
+        if graph.is_multigraph():
+            raise TypeError
+        self.graph = graph
+        self.directed = graph.is_directed()
+        self.nodes = list(graph.nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.succ = [[] for _ in self.nodes]
+        self.pred = self.succ if not self.directed else [[] for _ in self.nodes]
+        self.edges = set()
+        for u, v in graph.edges:
+            i, j = self.index[u], self.index[v]
+            self.edges.add((i, j))
+            if not self.directed:
+                self.edges.add((j, i))
+            if i == j:
+                continue
+            self.succ[i].append(j)
+            self.pred[j].append(i)
+        self.succ_mask = [sum(1 << j for j in neighbors) for neighbors in self.succ]
+        self.pred_mask = self.succ_mask if not self.directed else [sum(1 << j for j in neighbors)
+                                                                   for neighbors in self.pred]
+
+    def incident(self, node):
+        """Return (neighbor, edge) tuples for all edges incident to a node index, excluding self-loops.
+
+        Each edge is given as a pair of node indices. For an undirected graph, the edge is oriented away from node.
+        """
+        incident = [(neighbor, (node, neighbor)) for neighbor in self.succ[node]]
+        if self.directed:
+            incident.extend((neighbor, (neighbor, node)) for neighbor in self.pred[node])
+        return incident
+
+
 class NodeMatching:
     """Encapsulates the node matching of two graphs.
 
+    Internally, the nodes of both graphs are identified by integer indices into g1_labels and g2_labels, which
+    avoids hashing arbitrary node labels and traversing NetworkX views during the search. Only the maximal common
+    subgraphs are translated back to the original node labels.
+
     Attributes:
         graph1 (nx.Graph): The input graph with the smaller number of nodes.
         graph2 (nx.Graph): The input graph with the larger number of nodes.
+        g1_labels (list): The nodes of graph1, in the order of their integer indices.
+        g2_labels (list): The nodes of graph2, in the order of their integer indices.
         null_matches_allowed (bool): True if there are restrictions on which nodes are allowed to be matched
             based on node attributes (and therefore nodes in graph1 can have no match in graph2, and False otherwise.
             This is used to determine whether nodes_removed is allowed to be non-zero.
         node_matching (dict or None): The possible nodes of graph2 that can be feasibly matched to each node of graph1
-            based on node attributes. The keys are graph1 nodes, and the values are lists of graph2 nodes. If None,
-            then it is assumed that every node in graph1 is allowed to be matched to any node in graph2.
-        assignments (dict): The current node matching assignments (g1 nodes as keys, g2 nodes as values).
+            based on node attributes. The keys are graph1 node indices, and the values are lists of graph2 node
+            indices. If None, then it is assumed that every node in graph1 is allowed to be matched to any node
+            in graph2.
+        g1_order (list of int): The graph1 node indices in the order in which they are assigned during the search.
+        candidates (dict): The same information as node_matching, but with each list of graph2 node indices encoded
+            as a bitmask (bit i is set if the graph2 node with index i is compatible).
+        assignments (dict): The current node matching assignments (g1 node indices as keys, g2 node indices or None
+            as values).
+        matched (int): Bitmask of the g1 node indices that are currently assigned to some g2 node.
+        used (int): Bitmask of the g2 node indices that are currently assigned to some g1 node.
         edges_removed (int): The number of edges in graph1 that have been removed in the current common subgraph
             because the analogous edge in graph2 does not exist.
         nodes_removed (int): The number of nodes in graph1 that have intentionally been left unassigned in the
@@ -78,11 +148,16 @@ class NodeMatching:
             recursion can be terminated early. If a common subgraph with more nodes is found, then
             maximal_nodes_removed will decrease.
         maximal_common_subgraphs (list): A list of assignment dicts corresponding to the node matching assignments
-            corresponding to the maximal common subgraphs found thus far.
+            corresponding to the maximal common subgraphs found thus far. These are expressed in terms of the
+            original node labels of graph1 and graph2.
+        stopped_early (bool): True if the search was abandoned before completion because it could no longer yield
+            a unique maximal common subgraph (see the stop_on_multiple argument of mcgregor()).
     """
     def __init__(self, graph1, graph2, node_matching=None):
-        self.graph1 = graph1
-        self.graph2 = graph2
+        self.g1_labels = list(graph1.nodes)
+        self.g2_labels = list(graph2.nodes)
+        self.graph1 = graph1.graph if isinstance(graph1, FlatGraph) else graph1
+        self.graph2 = graph2.graph if isinstance(graph2, FlatGraph) else graph2
 
         if node_matching is None:
             self.null_matches_allowed = False
@@ -91,12 +166,16 @@ class NodeMatching:
 
         self.node_matching = {}
         if node_matching:
-            self.node_matching = node_matching
+            g1_index = {node: i for i, node in enumerate(self.g1_labels)}
+            g2_index = {node: i for i, node in enumerate(self.g2_labels)}
+            for node, g2nodes in node_matching.items():
+                self.node_matching[g1_index[node]] = [g2_index[x] for x in g2nodes]
         elif node_matching is None:
-            g1nodes = graph1.nodes
-            g2nodes = graph2.nodes
-            for node in g1nodes:
+            g2nodes = list(range(len(self.g2_labels)))
+            for node in range(len(self.g1_labels)):
                 self.node_matching[node] = g2nodes
+        self.g1_order = list(self.node_matching.keys())
+        self.candidates = {node: sum(1 << x for x in g2nodes) for node, g2nodes in self.node_matching.items()}
 
         self.edges_removed = 0
         self.nodes_removed = 0
@@ -105,7 +184,10 @@ class NodeMatching:
         self.edges_added = 0
         self.edges_in_maximal_subgraph = 0
         self.assignments = {}
+        self.matched = 0
+        self.used = 0
         self.maximal_common_subgraphs = []
+        self.stopped_early = False
 
     def __str__(self):
         return "{} maximal common subgraphs with {} nodes and {} edges ({} nodes and {} edges removed)".format(
@@ -113,13 +195,17 @@ class NodeMatching:
             self.edges_in_maximal_subgraph, self.maximal_nodes_removed, self.maximal_edges_removed)
 
     def g1nodes(self):
-        """Return all nodes in g1"""
+        """Return all node indices in g1"""
         return self.node_matching.keys()
 
     def g2nodes(self, g1node):
-        """Return all nodes in g2 that are compatible with g1node"""
+        """Return all node indices in g2 that are compatible with g1node"""
         return self.node_matching[g1node]
 
+    def current_subgraph(self):
+        """Return the current set of assignments in terms of the original node labels."""
+        return {self.g1_labels[k]: self.g2_labels[v] for (k, v) in self.assignments.items() if v is not None}
+
     def add_as_maximal(self):
         """Add the current set of assignments as a maximal common subgraph.
 
@@ -129,12 +215,12 @@ class NodeMatching:
         logger = logging.getLogger(__name__)
         if self.edges_added > self.edges_in_maximal_subgraph or self.nodes_removed < self.maximal_nodes_removed:
             self.maximal_common_subgraphs.clear()
-            self.maximal_common_subgraphs.append({k: v for (k, v) in self.assignments.items() if v is not None})
+            self.maximal_common_subgraphs.append(self.current_subgraph())
             self.edges_in_maximal_subgraph = self.edges_added
             logger.info("found a bigger common subgraph (%s nodes, %s edges)",
                         len(self.node_matching) - self.nodes_removed, self.edges_in_maximal_subgraph)
         elif self.edges_added == self.edges_in_maximal_subgraph and self.nodes_removed == self.maximal_nodes_removed:
-            self.maximal_common_subgraphs.append({k: v for (k, v) in self.assignments.items() if v is not None})
+            self.maximal_common_subgraphs.append(self.current_subgraph())
             logger.debug("found another common subgraph with %s nodes and %s edges",
                          len(self.node_matching) - self.nodes_removed, self.edges_in_maximal_subgraph)
 
@@ -147,18 +233,112 @@ class NodeMatching:
             logger.info("found new bound on removed nodes (%s)", self.maximal_nodes_removed)
 
 
-def mcgregor(graph1, graph2, node_comparison=None, edge_comparison=None):
+def compatibility_matrix(graph1, graph2, node_comparison, node_key=None):
+    """Evaluate a node comparison function once for every pair of nodes of two graphs.
+
+    Args:
+        graph1 (nx.Graph or FlatGraph): The first input graph.
+        graph2 (nx.Graph or FlatGraph): The second input graph.
+        node_comparison: A function with the same signature as the node_comparison argument of mcgregor(). If
+            FlatGraphs are given, it is passed the original graphs.
+        node_key: An optional function of a graph and one of its nodes that returns a hashable key. Nodes with
+            different keys, or with a key of None, must be incompatible. Such pairs are rejected by comparing whole
+            bitmasks of nodes at once, and node_comparison is only called for nodes with the same key.
+
+    Returns:
+        A list with one int per node of graph1 (in the order of graph1.nodes). Bit j of each int is set if the
+        node is compatible with the j-th node of graph2 (in the order of graph2.nodes).
+    """
+    g1_nodes = list(graph1.nodes)
+    g2_nodes = list(graph2.nodes)
+    if isinstance(graph1, FlatGraph):
+        graph1 = graph1.graph
+    if isinstance(graph2, FlatGraph):
+        graph2 = graph2.graph
+    if node_key is None:
+        key_masks = None
+        all_nodes = (1 << len(g2_nodes)) - 1
+    else:
+        key_masks = defaultdict(int)
+        for j, b_node in enumerate(g2_nodes):
+            key = node_key(graph2, b_node)
+            if key is not None:
+                key_masks[key] |= 1 << j
+
+    compat = []
+    for s_node in g1_nodes:
+        if key_masks is None:
+            candidates = all_nodes
+        else:
+            key = node_key(graph1, s_node)
+            candidates = key_masks.get(key, 0) if key is not None else 0
+        row = 0
+        while candidates:
+            bit = candidates & -candidates
+            candidates ^= bit
+            if node_comparison(graph1, graph2, s_node, g2_nodes[bit.bit_length() - 1]):
+                row |= bit
+        compat.append(row)
+    return compat
+
+
+def matching_bound(compat):
+    """Compute an upper bound on the number of nodes in any common subgraph allowed by a compatibility matrix.
+
+    The bound is the size of a maximum matching in the bipartite graph of compatible node pairs, which is found
+    using augmenting paths. It is never larger than the number of nodes of either graph that have at least one
+    compatible partner.
+
+    Args:
+        compat (list of int): A node compatibility matrix as returned by compatibility_matrix().
+
+    Returns:
+        The upper bound (int).
+    """
+    owner = {}
+
+    def augment(row, visited):
+        candidates = compat[row]
+        while candidates:
+            bit = candidates & -candidates
+            candidates ^= bit
+            if visited[0] & bit:
+                continue
+            visited[0] |= bit
+            column = bit.bit_length() - 1
+            if column not in owner or augment(owner[column], visited):
+                owner[column] = row
+                return True
+        return False
+
+    return sum(1 for row in range(len(compat)) if augment(row, [0]))
+
+
+class _SearchStopped(Exception):
+    pass
+
+
+def mcgregor(graph1, graph2, node_comparison=None, edge_comparison=None, compat=None, min_size=None,
+             stop_on_multiple=False):
     """Implements a recursive version of the McGregor algorithm for finding the maximal common node-induced
     subgraph of two input graphs subject to constraints on node and edge attributes.
 
      Args:
-         graph1 (nx.Graph): The input graph with the smaller degree.
-         graph2 (nx.Graph): The input graph with the larger degree.
+         graph1 (nx.Graph or FlatGraph): The input graph with the smaller degree.
+         graph2 (nx.Graph or FlatGraph): The input graph with the larger degree.
          node_comparison: A function that returns True if two nodes have compatible attributes. The function should
             have 4 arguments, namely, graph1, graph2, a node in graph1, and a node in graph2.
          edge_comparison: A function that returns True if two edges have compatible attributes. The function should
             have 6 arguments, namely, graph1, graph2, nodes 1 and 2 that define the edge in graph1, and nodes 1
             and 2 that define the edge in graph2.
+         compat (list of int): A precomputed node compatibility matrix as returned by compatibility_matrix(). If
+            given, node_comparison is ignored. If FlatGraphs are given, the matrix must have been computed for the
+            same FlatGraphs.
+         min_size (int): If given, branches of the search in which fewer than min_size nodes can be matched are
+            pruned, so only common subgraphs with at least min_size nodes are found.
+         stop_on_multiple (bool): If True, the search is abandoned as soon as a second maximal common subgraph is
+            found that cannot be superseded by a larger one, i.e. when it is known that the maximal common subgraph
+            is not unique. maximal_common_subgraphs then contains (at least) two entries.
 
      Returns:
          A NodeMatching object that contains the maximal common subgraph(s) and
@@ -173,76 +353,66 @@ def mcgregor(graph1, graph2, node_comparison=None, edge_comparison=None):
              matching (NodeMatching): The current state of the node matching.
         """
 
-        logger.debug("Entering graph_matcher() with %s", matching.assignments)
         starting_edges_removed = matching.edges_removed
         starting_edges_added = matching.edges_added
 
-        g1todo = [x for x in matching.g1nodes() if x not in matching.assignments.keys()]
-        logger.debug("Possible g1 nodes: %s", g1todo)
-        if g1todo:
-            g1node = g1todo[0]
-            logger.debug('Attempting to add node %s in graph1', g1node)
-            g1_possible_edges = edges_to_subgraph(matching, g1node)
+        # nodes of graph1 are always assigned in the order given by g1_order
+        if len(matching.assignments) < len(matching.g1_order):
+            g1node = matching.g1_order[len(matching.assignments)]
+            g1_possible_edges, out_mask, in_mask = edges_to_subgraph(matching, g1node)
 
-            g2_possible_nodes = [x for x in matching.g2nodes(g1node) if x not in list(matching.assignments.values())]
-            logger.debug('Feasible g2 nodes: %s', g2_possible_nodes)
+            g2_possible_nodes = matching.candidates[g1node] & ~matching.used
             if g2_possible_nodes:
-                for g2node in g2_possible_nodes:
-                    logger.debug('Attempting to match %s in graph1 with %s in graph2', g1node, g2node)
-
-                    edges_removed = starting_edges_removed
-                    edges_added = starting_edges_added
-                    for n1, n2 in g1_possible_edges:
-                        n1_2 = matching.assignments.get(n1, g2node)
-                        n2_2 = matching.assignments.get(n2, g2node)
-                        logger.debug('Comparing %s %s pair to %s %s', n1, n2, n1_2, n2_2)
-                        compatible_edge = False
-                        if matching.graph2.has_edge(n1_2, n2_2):
-                            logger.debug("Both graphs have an edge")
-                            if edge_comparison:
-                                if edge_comparison(matching.graph1, matching.graph2, n1, n2, n1_2, n2_2):
-                                    compatible_edge = True
-                                else:
-                                    logger.debug("Edges are incompatible")
-                            else:
-                                compatible_edge = True
-                        else:
-                            logger.debug("No corresponding edge in graph 2")
-
-                        if compatible_edge:
-                            edges_added += 1
-                        else:
-                            edges_removed += 1
-                            logger.debug("No compatible edge, edges_removed = %s", edges_removed)
+                remaining = g2_possible_nodes
+                while remaining:
+                    g2bit = remaining & -remaining
+                    remaining ^= g2bit
+                    g2node = g2bit.bit_length() - 1
+                    # the images of the matched neighbors that g2node is actually connected to
+                    present_out = out_mask & g2_succ_mask[g2node]
+                    present_in = in_mask & g2_pred_mask[g2node]
+                    if edge_comparison:
+                        edges_added = 0
+                        for n1, n2, image, outgoing in g1_possible_edges:
+                            if outgoing:
+                                if present_out >> image & 1 and compatible_edges(n1, n2, g2node, image):
+                                    edges_added += 1
+                            elif present_in >> image & 1 and compatible_edges(n1, n2, image, g2node):
+                                edges_added += 1
+                    else:
+                        edges_added = bin(present_out).count("1") + bin(present_in).count("1")
+                    edges_removed = starting_edges_removed + len(g1_possible_edges) - edges_added
+                    edges_added += starting_edges_added
 
                     if edges_removed > matching.maximal_edges_removed:
-                        logger.debug("Too many removed edges")
                         continue
 
                     matching.assignments[g1node] = g2node
+                    matching.matched |= 1 << g1node
+                    matching.used |= g2bit
                     matching.edges_removed = edges_removed
                     matching.edges_added = edges_added
                     graph_matcher(matching)
                     matching.edges_removed = starting_edges_removed
                     matching.edges_added = starting_edges_added
+                    matching.used ^= g2bit
+                    matching.matched ^= 1 << g1node
                     matching.assignments.pop(g1node, None)
 
-                if matching.null_matches_allowed and matching.nodes_removed < matching.maximal_nodes_removed:
-                    logger.debug('Removing %s in graph1', g1node)
+                if matching.null_matches_allowed and matching.nodes_removed < matching.maximal_nodes_removed \
+                        and matching.nodes_removed < max_nodes_removed:
                     matching.assignments[g1node] = None
                     matching.nodes_removed += 1
                     graph_matcher(matching)
                     matching.nodes_removed -= 1
                     matching.assignments.pop(g1node, None)
-            else:
-                logger.debug("No feasible g2 match, removing node")
+            elif matching.nodes_removed < max_nodes_removed:
                 matching.assignments[g1node] = None
                 matching.nodes_removed += 1
                 graph_matcher(matching)
                 matching.nodes_removed -= 1
                 matching.assignments.pop(g1node, None)
         else:
-            logger.debug("Recursion bottomed out")
             new_maximal = True
             if matching.edges_removed > matching.maximal_edges_removed:
                 new_maximal = False
@@ -253,51 +423,96 @@ def mcgregor(graph1, graph2, node_comparison=None, edge_comparison=None):
             if new_maximal:
                 logger.debug("Found a possible new maximal subgraph")
                 matching.add_as_maximal()
+                if stop_on_multiple and len(matching.maximal_common_subgraphs) > 1 and \
+                        matching.maximal_nodes_removed == 0 and matching.edges_in_maximal_subgraph == g1_edge_count:
+                    raise _SearchStopped
+
+    def edges_to_subgraph(matching, new_node):
+        """Returns all edges from a node to the currently matched subgraph of g1.
 
-    def edges_to_subgraph_undirected(matching, new_node):
-        """Returns all edges from a node to the currently matched subgraph of g1
-        if g1 is undirected."""
-        g1_subgraph_nodes = [x for x in matching.assignments.keys() if matching.assignments[x] is not None]
-        return [(n1, n2) for (n1, n2) in matching.graph1.edges(new_node)
-                if n1 in g1_subgraph_nodes or n2 in g1_subgraph_nodes]
-
-    def edges_to_subgraph_directed(matching, new_node):
-        """Returns all edges from a node to the currently matched subgraph of g1
-        if g1 is directed."""
-        g1_subgraph_nodes = [x for x in matching.assignments.keys() if matching.assignments[x] is not None]
-        out_edges = [(n1, n2) for (n1, n2) in matching.graph1.edges(new_node)
-                     if n1 in g1_subgraph_nodes or n2 in g1_subgraph_nodes]
-        in_edges = [(n2, n1) for (n1, n2) in matching.graph1.reverse().edges(new_node)
-                    if n1 in g1_subgraph_nodes or n2 in g1_subgraph_nodes]
-        return out_edges + in_edges
+        Returns:
+            A tuple of a list of (n1, n2, image, outgoing) tuples, one for each edge (n1, n2), where image is the g2
+            node assigned to the neighbor of new_node and outgoing is True if new_node is n1, followed by bitmasks of
+            the images of the neighbors of new_node via outgoing and incoming edges.
+        """
+        matched = matching.matched
+        assignments = matching.assignments
+        edges = []
+        out_mask = 0
+        in_mask = 0
+        for neighbor, (n1, n2) in g1_incident[new_node]:
+            if matched >> neighbor & 1:
+                image = assignments[neighbor]
+                outgoing = n1 == new_node
+                if outgoing:
+                    out_mask |= 1 << image
+                else:
+                    in_mask |= 1 << image
+                edges.append((n1, n2, image, outgoing))
+        return edges, out_mask, in_mask
+
+    def compatible_edges(n1, n2, n1_2, n2_2):
+        """Returns True if the edge (n1, n2) of g1 is compatible with the edge (n1_2, n2_2) of g2, caching the
+        result of edge_comparison."""
+        if not edge_comparison:
+            return True
+        key = (n1, n2, n1_2, n2_2)
+        if key not in edge_cache:
+            edge_cache[key] = edge_comparison(graph1, graph2, g1_labels[n1], g1_labels[n2],
+                                              g2_labels[n1_2], g2_labels[n2_2])
+        return edge_cache[key]
 
     logger = logging.getLogger(__name__)
 
+    flat1 = graph1 if isinstance(graph1, FlatGraph) else FlatGraph(graph1)
+    flat2 = graph2 if isinstance(graph2, FlatGraph) else FlatGraph(graph2)
+    graph1, graph2 = flat1.graph, flat2.graph
+
+    # from here on, the node order is always taken from the FlatGraphs, since they may be older snapshots
     if graph1.is_multigraph() or graph2.is_multigraph():
         raise TypeError
 
-    if graph1.is_directed() and graph2.is_directed():
-        edges_to_subgraph = edges_to_subgraph_directed
-    elif not graph1.is_directed() and not graph2.is_directed():
-        edges_to_subgraph = edges_to_subgraph_undirected
-    else:
+    # the FlatGraphs handle both kinds of graph, but they cannot be mixed
+    if graph1.is_directed() != graph2.is_directed():
         raise TypeError
 
-    if graph1.number_of_nodes() > graph2.number_of_nodes():
+    if len(flat1.nodes) > len(flat2.nodes):
         raise ValueError("graph1 must not have greater degree than graph2")
 
-    if node_comparison:
+    if compat is None and node_comparison:
+        compat = compatibility_matrix(flat1, flat2, node_comparison)
+
+    if compat is not None:
         node_matches = defaultdict(list)
-        for s_node in graph1.nodes:
-            for b_node in graph2.nodes:
-                if node_comparison(graph1, graph2, s_node, b_node):
+        for s_node, row in zip(flat1.nodes, compat):
+            for j, b_node in enumerate(flat2.nodes):
+                if row >> j & 1:
                     node_matches[s_node].append(b_node)
     else:
         node_matches = None
 
-    mcs = NodeMatching(graph1, graph2, node_matches)
-    if mcs.node_matching:
-        graph_matcher(mcs)
+    mcs = NodeMatching(flat1, flat2, node_matches)
+
+    g1_labels = mcs.g1_labels
+    g2_labels = mcs.g2_labels
+    g1_incident = [flat1.incident(node) for node in range(len(g1_labels))]
+    g2_succ_mask = flat2.succ_mask
+    g2_pred_mask = flat2.pred_mask
+    edge_cache = {}
+
+    # with every node of graph1 matched and every edge between them preserved, no larger common subgraph exists
+    g1_edge_count = sum(1 for node in mcs.g1_order for (neighbor, edge) in g1_incident[node]
+                        if neighbor in mcs.node_matching) // 2
+    # the number of nodes that can be left unassigned while still matching at least min_size nodes
+    max_nodes_removed = len(mcs.g1_order) - min_size if min_size else math.inf
+
+    if mcs.node_matching and max_nodes_removed >= 0:
+        try:
+            graph_matcher(mcs)
+        except _SearchStopped:
+            mcs.stopped_early = True
+            logger.info("multiple maximal common subgraphs, stopping search")
+    if mcs.maximal_common_subgraphs:
         logger.info("found %s maximal common subgraphs with %s nodes and %s edges",
                     len(mcs.maximal_common_subgraphs), len(mcs.maximal_common_subgraphs[0].keys()),
                     mcs.edges_in_maximal_subgraph)
@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+
+import networkx as nx
+
+from birth_merge import *
+from data_model import *
+
+
+def family(surname, double_birth=False, daughters=()):
+    """Construct a graph of a father, mother, son and any daughters, where the son optionally has two Birth Facts."""
+    thesaurus = {"Ivan": "IVAN", "Anna": "ANNA", "Petro": "PETRO", surname: surname.upper()}
+    thesaurus.update((given, given.upper()) for given in daughters)
+    father = Person(names=Name("birth", {"given": "Ivan", "surname": surname}, thesaurus=thesaurus), gender="m")
+    mother = Person(names=Name("married", {"given": "Anna", "surname": surname}, thesaurus=thesaurus), gender="f")
+    son = Person(names=Name("birth", {"given": "Petro", "surname": surname}, thesaurus=thesaurus), gender="m",
+                 facts=Fact("Birth", date=Date("1900-01-01"), sources=Source(repository="parish")))
+    if double_birth:
+        son.add_fact(Fact("Birth", date=Date("1900-01-02"), sources=Source(repository="parish")))
+    graph = nx.DiGraph()
+    for person in (father, mother, son):
+        graph.add_node(person.identifier, person=person)
+    for relation in (Relationship(father.identifier, mother.identifier, "spouse"),
+                     Relationship(father.identifier, son.identifier, "parent-child"),
+                     Relationship(mother.identifier, son.identifier, "parent-child")):
+        graph.add_edge(relation.from_id, relation.to_id, relation=relation)
+    for given in daughters:
+        daughter = Person(names=Name("birth", {"given": given, "surname": surname}, thesaurus=thesaurus), gender="f")
+        graph.add_node(daughter.identifier, person=daughter)
+        for parent in (father, mother):
+            relation = Relationship(parent.identifier, daughter.identifier, "parent-child")
+            graph.add_edge(relation.from_id, relation.to_id, relation=relation)
+    return graph
+
+
+class TestMatchTargets:
+    def test_node_comparison_error(self, capsys):
+        graph = nx.union(family("Moroz"), family("Moroz", double_birth=True))
+        twigs = [set(component) for component in nx.weakly_connected_components(graph)]
+        processed_twigs = {"target": (twigs[1], frozenset())}
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            for pool in (None, executor):
+                results = list(match_targets(twigs[0], ["target"], processed_twigs, graph, cached_matchers(graph), 2,
+                                             executor=pool))
+                assert results == []
+                assert "error during macgregor" in capsys.readouterr().out
+
+
+class TestMain:
+    def test_workers(self, tmp_path, monkeypatch):
+        # two records of each of three families, which should each be merged into one twig
+        graph = nx.union_all([family(surname, daughters=("Maria", "Olha"))
+                              for surname in ("Moroz", "Dudka", "Kit") for _ in range(2)])
+        graph_json = {"persons": [graph.nodes[node]["person"].json() for node in graph.nodes],
+                      "relations": [relation.json() for _, _, relation in graph.edges.data("relation")]}
+        monkeypatch.chdir(tmp_path)
+        results = []
+        for workers in (None, 2):
+            (tmp_path / "dum.json").write_text(json.dumps(graph_json))
+            main(workers=workers)
+            merged = graph_model.PeopleGraph(graph_json=json.loads((tmp_path / "dum2.json").read_text()))
+            alive = merged.graph.subgraph(merged.alive)
+            results.append((len(merged.alive), nx.number_weakly_connected_components(alive)))
+        assert results[0] == results[1] == (15, 3)
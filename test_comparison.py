@@ -0,0 +1,49 @@
+from comparison import *
+
+
+def person(given, surname, gender, birth=None, death=None):
+    thesaurus = {"Ivan": "IVAN", "Petro": "PETRO", "Moroz": "MOROZ", "Morozenko": "MOROZENKO", "Dudka": "DUDKA"}
+    facts = [Fact(fact_type, Date(date)) for fact_type, date in (("Birth", birth), ("Death", death)) if date] or None
+    return Person(names=Name("birth", {"given": given, "surname": surname}, thesaurus=thesaurus), gender=gender,
+                  facts=facts)
+
+
+class TestLocation:
+    def test_location_match(self):
+        locations1 = [Location(12), Location(7, 30, "Dubno")]
+        locations2 = [Location(12, 40), Location(30, alt_village="Dubno"), Location(7)]
+        assert location_match(locations1, locations2) == sum(compare_location(loc1, loc2) for loc1 in locations1
+                                                             for loc2 in locations2) == 2
+        assert location_match(locations1, []) == 0
+
+
+class TestBlocking:
+    def test_candidate_pairs(self):
+        ivan = person("Ivan", "Moroz", "m", "1850-06-01")
+        petro = person("Petro", "Morozenko", "m", "1855-01-01")
+        dudka = person("Ivan", "Dudka", "m", "1850-06-01")
+        daughter = person("Ivan", "Moroz", "f", "1850-06-01")
+        stillborn = person("Ivan", "Moroz", "m", "1850-06-01")
+        stillborn.add_fact(Fact("Stillbirth"))
+        persons = [ivan, petro, dudka, daughter, stillborn]
+
+        assert blocking_keys(ivan) == {("m", "MORO", 185)}
+        assert blocking_keys(stillborn) == set()
+        pairs = list(candidate_pairs(build_blocking_index(persons)))
+        assert pairs == [tuple(sorted((ivan.identifier, petro.identifier)))]
+
+        # only one of the two has a birth Date, but they share the decade of their death Date
+        born = person("Ivan", "Moroz", "m", "1850-01-01", death="1900-01-01")
+        unborn = person("Ivan", "Moroz", "m", death="1900-01-01")
+        assert not person_mismatch(born, unborn)
+        assert blocking_keys(born) == {("m", "MORO", 185), ("m", "MORO", 190)}
+        pairs = list(candidate_pairs(build_blocking_index([born, unborn])))
+        assert pairs == [tuple(sorted((born.identifier, unborn.identifier)))]
+
+    def test_sorted_neighborhood_pairs(self):
+        dudka = person("Ivan", "Dudka", "m")
+        ivan = person("Ivan", "Moroz", "m")
+        petro = person("Petro", "Morozenko", "m")
+        pairs = list(sorted_neighborhood_pairs([petro, ivan, dudka], window=2))
+        assert pairs == [tuple(sorted((dudka.identifier, ivan.identifier))),
+                         tuple(sorted((ivan.identifier, petro.identifier)))]
@@ -1,3 +1,5 @@
+import pytest
+
 from data_model import *
 
 
@@ -6,6 +8,13 @@ class TestDateDuration:
         date = Date("1900-01-01")
         duration = Duration([1, 0, 0, 0])
         assert subtract(date, duration)[0].json() == {"start": "1898-01-02", "end": "1899-01-01", "accuracy": 10}
+        assert Duration(json_dict=duration.json()).duration == duration.duration
+
+    def test_date_format(self):
+        assert Date("1850-1-1").start == datetime.date(1850, 1, 1)
+        for date_string in ("18500101", "1850-W01-1"):
+            with pytest.raises(ValueError):
+                Date(date_string)
 
 
 class TestFact:
@@ -14,3 +23,23 @@ class TestFact:
         assert fact.json() == {"fact_type": "Birth",
                                "date": [{'start': '1900-01-01', 'end': '1900-01-01', "accuracy": 0}],
                                'confidence': 'normal'}
+
+
+class TestRelationship:
+    def test_can_merge(self):
+        relation1 = Relationship("a", "c", "parent-child")
+        relation2 = Relationship("b", "c", "parent-child")
+        assert not relation1.can_merge(relation2)
+        assert relation1.can_merge(relation2, from_id="merged")
+        assert not relation1.can_merge(Relationship("b", "c", "spouse"), from_id="merged")
+
+
+class TestPerson:
+    def test_name_key(self):
+        thesaurus = {"Ivan": "IVAN", "Moroz": "MOROZ", "Dudka": "DUDKA"}
+        person = Person(names=Name("birth", {"given": "Ivan", "surname": "Moroz"}, thesaurus=thesaurus))
+        assert person.name_key() == (("IVAN", "MOROZ"), ())
+        assert not person.has_name("married")
+        person.add_name(Name("married", {"surname": "Dudka"}, thesaurus=thesaurus))
+        assert person.name_key() == (("IVAN", "MOROZ"), ((None, "DUDKA"),))
+        assert person.has_name("married")
@@ -0,0 +1,96 @@
+from mcgregor import *
+
+
+def shape_match(g1, g2, node1, node2):
+    return g1.nodes[node1]["shape"] == g2.nodes[node2]["shape"]
+
+
+def type_match(g1, g2, n1_in_g1, n2_in_g1, n1_in_g2, n2_in_g2):
+    return g1.edges[n1_in_g1, n2_in_g1]["type"] == g2.edges[n1_in_g2, n2_in_g2]["type"]
+
+
+class TestMcGregor:
+    def test_directed(self):
+        blob1 = nx.DiGraph()
+        blob1.add_edge("A", "B", type="straight")
+        blob1.add_edge("B", "C", type="wavy")
+        blob2 = nx.DiGraph()
+        blob2.add_edge("x", "a", type="wavy")
+        blob2.add_edge("a", "b", type="straight")
+        blob2.add_edge("b", "c", type="wavy")
+        for blob, shapes in ((blob1, {"A": "round", "B": "square", "C": "round"}),
+                             (blob2, {"x": "square", "a": "round", "b": "square", "c": "round"})):
+            for node, shape in shapes.items():
+                blob.nodes[node]["shape"] = shape
+
+        mcs = mcgregor(blob1, blob2, node_comparison=shape_match, edge_comparison=type_match)
+        assert mcs.maximal_common_subgraphs == [{"A": "a", "B": "b", "C": "c"}]
+        assert mcs.edges_in_maximal_subgraph == 2
+
+    def test_undirected(self):
+        blob1 = nx.Graph([("A", "B"), ("B", "C"), ("C", "A")])
+        blob2 = nx.Graph([("a", "b"), ("b", "c"), ("c", "d")])
+        mcs = mcgregor(blob1, blob2)
+        assert mcs.edges_in_maximal_subgraph == 2
+        assert mcs.maximal_edges_removed == 1
+        assert {"A": "a", "B": "b", "C": "c"} in mcs.maximal_common_subgraphs
+
+    def test_no_compatible_nodes(self):
+        blob1 = nx.DiGraph([("A", "B")])
+        blob2 = nx.DiGraph([("a", "b")])
+        mcs = mcgregor(blob1, blob2, node_comparison=lambda g1, g2, n1, n2: False)
+        assert mcs.maximal_common_subgraphs == []
+
+    def test_compatibility_matrix_key(self):
+        blob1 = nx.Graph([("A", "B")])
+        blob2 = nx.Graph([("a", "b"), ("b", "c")])
+        shapes = {"A": "round", "B": "square", "a": "square", "b": "round", "c": "round"}
+        for blob in (blob1, blob2):
+            for node in blob.nodes:
+                blob.nodes[node]["shape"] = shapes[node]
+        compared = []
+
+        def node_match(g1, g2, node1, node2):
+            compared.append((node1, node2))
+            return node2 != "c"
+
+        compat = compatibility_matrix(blob1, blob2, node_match, node_key=lambda g, node: g.nodes[node]["shape"])
+        assert compat == [0b010, 0b001]
+        assert sorted(compared) == [("A", "b"), ("A", "c"), ("B", "a")]
+
+    def test_matching_bound(self):
+        # rows 0 and 1 both only fit column 0, so only two of the three rows can be matched
+        assert matching_bound([0b001, 0b001, 0b011]) == 2
+        assert matching_bound([0b011, 0b001, 0b100]) == 3
+        assert matching_bound([0, 0]) == 0
+
+    def test_min_size(self):
+        blob1 = nx.DiGraph([("A", "B"), ("B", "C")])
+        blob2 = nx.DiGraph([("a", "b"), ("b", "c"), ("c", "d")])
+        compatible = lambda g1, g2, n1, n2: True
+        mcs = mcgregor(blob1, blob2, node_comparison=compatible, min_size=3)
+        assert {"A": "a", "B": "b", "C": "c"} in mcs.maximal_common_subgraphs
+        mcs = mcgregor(blob1, blob2, node_comparison=compatible, min_size=4)
+        assert mcs.maximal_common_subgraphs == []
+
+    def test_stop_on_multiple(self):
+        blob1 = nx.Graph([("A", "B")])
+        blob2 = nx.Graph([("a", "b"), ("b", "c")])
+        mcs = mcgregor(blob1, blob2, stop_on_multiple=True)
+        assert mcs.stopped_early
+        assert len(mcs.maximal_common_subgraphs) == 2
+        assert len(mcgregor(blob1, blob2).maximal_common_subgraphs) == 4
+
+    def test_flat_graph(self):
+        blob = nx.DiGraph([("A", "B"), ("B", "C"), ("C", "C")])
+        flat = FlatGraph(blob)
+        assert flat.nodes == ["A", "B", "C"]
+        assert flat.succ == [[1], [2], []]
+        assert flat.pred == [[], [0], [1]]
+        assert flat.edges == {(0, 1), (1, 2), (2, 2)}
+        assert flat.succ_mask == [0b010, 0b100, 0]
+        assert flat.pred_mask == [0, 0b001, 0b010]
+        assert sorted(flat.incident(1)) == [(0, (0, 1)), (2, (1, 2))]
+
+        mcs = mcgregor(flat, FlatGraph(nx.DiGraph([("a", "b"), ("b", "c")])))
+        assert mcs.maximal_common_subgraphs == [{"A": "a", "B": "b", "C": "c"}]